@@ -0,0 +1,606 @@
+"""
+Compact, versioned binary audit log ("RLOG"), selected with rules.yaml `audit.format: compact`.
+
+File layout (little-endian):
+  header   b"RLOG" u16 format_version u16 reserved
+  entries  u32 length + payload, where payload[0] is the entry kind:
+    KIND_STRING  u32 id + utf-8 text         (string dictionary, written before first use)
+    KIND_RECORD  fixed struct + reason codes + inline texts + extras
+
+A record keeps the fields /route logs on every request in a fixed struct
+(COLUMNS, plus the nested GROUPS): presence mask, bool bits, request_id as 16
+raw bytes, ts as epoch seconds, ints as u32, floats as f64 and strings as
+dictionary ids (tiers, models, task types, routing reasons repeat constantly).
+The dictionary never shrinks, so client-driven strings (tenant, escalation and
+reject reasons) are TEXT columns instead, stored inline after the struct as
+u16 length + utf-8. decision.reason_codes are one byte each (ReasonCode bit
+index). Any field that does not fit its column, or has no column (e.g.
+chunked), goes to a compact JSON "extras" blob, so records round-trip exactly
+and conversion from JSONL is lossless.
+
+String ids are assigned per writer, so a log has a single writer: the writer
+holds an exclusive lock on the file (run one uvicorn worker per log file).
+
+AuditLogReader memory-maps a file: scan()/columns() read fixed columns with one
+struct.unpack per record and never decode JSON; records() rebuilds full dicts.
+"""
+import datetime
+import functools
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from collections import deque
+from typing import Any, BinaryIO, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .decision import ReasonCode
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single writer is on the operator
+    fcntl = None
+from .json_codec import dumps, loads
+
+MAGIC = b"RLOG"
+FORMAT_VERSION = 3
+
+KIND_RECORD = 0
+KIND_STRING = 1
+
+INT, STR, TEXT, FLOAT, BOOL = "int", "str", "text", "float", "bool"
+NONE_U32 = 0xFFFFFFFF
+NONE_U16 = 0xFFFF
+TS_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# Top-level columns in struct order. Changing COLUMNS or GROUPS needs a new FORMAT_VERSION.
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("rules_version", INT), ("task_len_chars", INT), ("answer_len_chars", INT),
+    ("latency_ms_llm", INT), ("latency_ms_llm_initial", INT), ("latency_ms_total", INT),
+    ("queue_wait_ms", INT), ("max_latency_ms", INT),
+    ("mode", STR), ("tenant", TEXT), ("execution_mode", STR), ("task_type_hint", STR),
+    ("risk_level", STR), ("final_model_name", STR), ("escalation_reason", TEXT), ("reject_reason", TEXT),
+    ("cancel_reason", TEXT), ("cancel_stage", STR), ("validation_skipped", STR),
+    ("escalated", BOOL), ("cache_hit", BOOL), ("cache_hit_first", BOOL), ("cache_hit_escalation", BOOL),
+    ("validation_cached", BOOL), ("format_constrained", BOOL), ("json_repaired", BOOL),
+)
+# Nested dicts stored as columns when they have exactly these keys (decision also has reason_codes).
+GROUPS: Tuple[Tuple[str, Tuple[Tuple[str, str], ...]], ...] = (
+    ("decision", (("chosen_tier", STR), ("chosen_model_name", STR), ("task_type", STR), ("routing_reason", STR))),
+    ("usage", (("input_tokens", INT), ("output_tokens", INT), ("total_tokens", INT))),
+    ("preflight", (("model", STR), ("est_input_tokens", INT), ("est_output_tokens", INT),
+                   ("predicted_latency_ms", INT), ("predicted_cost", FLOAT))),
+)
+
+_HEADER = struct.Struct("<4sHH")
+_LEN = struct.Struct("<I")
+_TEXT_LEN = struct.Struct("<H")
+_STRING = struct.Struct("<BI")
+
+# Presence mask bits: request_id, ts, one per group, one per column.
+_BIT_REQUEST_ID = 0
+_BIT_TS = 1
+_BIT_GROUP0 = 2
+_BIT_COLUMN0 = _BIT_GROUP0 + len(GROUPS)
+
+# Unpacked row: kind, presence mask, bool bits, request_id, ts, then one slot per
+# non-bool column and per group field.
+_SLOT0 = 5
+_CODES = {INT: "I", STR: "I", FLOAT: "d"}
+
+# (name, kind, presence bit, row slot -- or bit index in the bool bits for BOOL,
+# index among the TEXT columns for TEXT)
+_COLUMN_PLAN: List[Tuple[str, str, int, int]] = []
+# (group, presence bit, ((field, kind, row slot), ...))
+_GROUP_PLAN: List[Tuple[str, int, Tuple[Tuple[str, str, int], ...]]] = []
+_slot_kinds: List[str] = []
+_n_bools = 0
+_n_texts = 0
+for _i, (_name, _kind) in enumerate(COLUMNS):
+    if _kind == BOOL:
+        _COLUMN_PLAN.append((_name, _kind, _BIT_COLUMN0 + _i, _n_bools))
+        _n_bools += 1
+    elif _kind == TEXT:
+        _COLUMN_PLAN.append((_name, _kind, _BIT_COLUMN0 + _i, _n_texts))
+        _n_texts += 1
+    else:
+        _COLUMN_PLAN.append((_name, _kind, _BIT_COLUMN0 + _i, _SLOT0 + len(_slot_kinds)))
+        _slot_kinds.append(_kind)
+for _g, (_group, _fields) in enumerate(GROUPS):
+    _GROUP_PLAN.append((_group, _BIT_GROUP0 + _g, tuple(
+        (_f, _k, _SLOT0 + len(_slot_kinds) + _j) for _j, (_f, _k) in enumerate(_fields))))
+    _slot_kinds.extend(_k for _, _k in _fields)
+
+_RECORD = struct.Struct("<BQI16sI" + "".join(_CODES[k] for k in _slot_kinds))
+# Row template for the writer: kind, mask, bools, request_id and ts are set per record.
+_EMPTY_ROW = [KIND_RECORD, 0, 0, bytes(16), 0] + [math.nan if k == FLOAT else NONE_U32 for k in _slot_kinds]
+_MISFIT = object()
+# Presence bits of the TEXT columns, in the order their values follow the reason codes.
+_TEXT_BITS = tuple(bit for _, kind, bit, _ in _COLUMN_PLAN if kind == TEXT)
+_GROUP_KEYS = {
+    group: frozenset(f for f, _, _ in fields) | ({"reason_codes"} if group == "decision" else frozenset())
+    for group, _, fields in _GROUP_PLAN
+}
+
+# Stable one-byte codes: the bit index of each ReasonCode flag.
+_REASON_TO_CODE = {c.name: int(c).bit_length() - 1 for c in ReasonCode}
+_CODE_TO_REASON = {v: k for k, v in _REASON_TO_CODE.items()}
+
+# Fields scan()/columns() can read without decoding JSON.
+SCAN_FIELDS = (
+    ("request_id", "ts")
+    + tuple(name for name, _ in COLUMNS)
+    + tuple(f"{group}.{f}" for group, fields in GROUPS for f, _ in fields)
+    + ("decision.reason_codes",)
+)
+
+# Only canonical forms are columnized, so decoding gives back the exact string.
+_UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+_TS_RE = re.compile(r"(\d{4}-\d\d-\d\d)T(\d\d):(\d\d):(\d\d)Z")
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+@functools.lru_cache(maxsize=64)
+def _day_epoch(day: str) -> Optional[int]:
+    try:
+        d = datetime.date.fromisoformat(day)
+    except ValueError:
+        return None
+    return (d.toordinal() - _EPOCH_ORDINAL) * 86400
+
+
+def _ts_to_epoch(value: Any) -> Optional[int]:
+    m = _TS_RE.fullmatch(value) if type(value) is str else None
+    if m is None:
+        return None
+    day = _day_epoch(m.group(1))
+    h, mi, sec = int(m.group(2)), int(m.group(3)), int(m.group(4))
+    if day is None or h > 23 or mi > 59 or sec > 59:
+        return None
+    epoch = day + h * 3600 + mi * 60 + sec
+    return epoch if 0 <= epoch < NONE_U32 else None
+
+
+def _uuid_str(raw: bytes) -> str:
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _read_texts(mm: Any, mask: int, off: int) -> Tuple[List[Optional[str]], int]:
+    """TEXT column values (None where absent) starting at `off`, and the offset after them."""
+    values: List[Optional[str]] = []
+    for bit in _TEXT_BITS:
+        if not mask & 1 << bit:
+            values.append(None)
+            continue
+        (n,) = _TEXT_LEN.unpack_from(mm, off)
+        off += 2
+        if n == NONE_U16:
+            values.append(None)
+        else:
+            values.append(bytes(mm[off:off + n]).decode("utf-8"))
+            off += n
+    return values, off
+
+
+def _slot_value(kind: str, v: Any, strings: List[str]) -> Any:
+    if kind == FLOAT:
+        return None if math.isnan(v) else v
+    if v == NONE_U32:
+        return None
+    return strings[v] if kind == STR else v
+
+
+class CompactAuditWriter:
+    """
+    Thread-safe appender and the file's only writer (exclusive lock, RuntimeError
+    if another process holds it). Reopening an existing file reloads its string
+    dictionary.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ids: Dict[str, int] = {}
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self._f = open(path, "ab")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._f.close()
+                raise RuntimeError(f"{path} already has a writer (one process per compact audit log)")
+        try:
+            size = os.fstat(self._f.fileno()).st_size
+            if size > 0:
+                with AuditLogReader(path) as reader:
+                    valid_end = reader.load_strings()
+                    self._ids = {s: i for i, s in enumerate(reader.strings)}
+                if valid_end < size:
+                    self._f.truncate(valid_end)  # torn entry from a crash
+            else:
+                self._f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0))
+        except Exception:
+            self._f.close()
+            raise
+
+    def _sid(self, value: Optional[str], out: List[bytes]) -> int:
+        if value is None:
+            return NONE_U32
+        sid = self._ids.get(value)
+        if sid is None:
+            sid = self._ids[value] = len(self._ids)
+            payload = _STRING.pack(KIND_STRING, sid) + value.encode("utf-8")
+            out.append(_LEN.pack(len(payload)) + payload)
+        return sid
+
+    def _to_slot(self, kind: str, v: Any, out: List[bytes]) -> Any:
+        """Slot value for a group field, or _MISFIT."""
+        if v is None:
+            return NONE_U32 if kind != FLOAT else math.nan
+        if kind == STR:
+            return self._sid(v, out) if type(v) is str else _MISFIT
+        if kind == INT:
+            return v if type(v) is int and 0 <= v < NONE_U32 else _MISFIT
+        return v if type(v) is float and v == v else _MISFIT
+
+    def _encode(self, record: Dict[str, Any], out: List[bytes]) -> bytes:
+        rec = dict(record)
+        row = _EMPTY_ROW[:]
+        mask = 0
+        bools = 0
+
+        rid = rec.get("request_id")
+        if type(rid) is str and _UUID_RE.fullmatch(rid):
+            row[3] = bytes.fromhex(rid.replace("-", ""))
+            del rec["request_id"]
+            mask |= 1 << _BIT_REQUEST_ID
+        ts = _ts_to_epoch(rec.get("ts"))
+        if ts is not None:
+            row[4] = ts
+            del rec["ts"]
+            mask |= 1 << _BIT_TS
+
+        # Inlined per kind: this loop is most of the per-record cost.
+        ids = self._ids
+        texts: List[bytes] = []
+        for name, kind, bit, slot in _COLUMN_PLAN:
+            if name not in rec:
+                continue
+            v = rec[name]
+            if kind == BOOL:
+                if type(v) is not bool:
+                    continue
+                if v:
+                    bools |= 1 << slot
+            elif kind == TEXT:
+                if v is None:
+                    texts.append(_TEXT_LEN.pack(NONE_U16))
+                elif type(v) is not str:
+                    continue
+                else:
+                    raw = v.encode("utf-8")
+                    if len(raw) >= NONE_U16:
+                        continue
+                    texts.append(_TEXT_LEN.pack(len(raw)) + raw)
+            elif v is None:
+                pass  # the row already holds the None sentinel
+            elif kind == STR:
+                if type(v) is not str:
+                    continue
+                sid = ids.get(v)
+                row[slot] = self._sid(v, out) if sid is None else sid
+            elif kind == INT:
+                if type(v) is not int or not 0 <= v < NONE_U32:
+                    continue
+                row[slot] = v
+            else:
+                if type(v) is not float or v != v:
+                    continue
+                row[slot] = v
+            del rec[name]
+            mask |= 1 << bit
+
+        codes = b""
+        for group, bit, fields in _GROUP_PLAN:
+            g = rec.get(group)
+            if type(g) is not dict or g.keys() != _GROUP_KEYS[group]:
+                continue
+            if group == "decision":
+                rc = g["reason_codes"]
+                if type(rc) is not list or len(rc) > 255 or not all(c in _REASON_TO_CODE for c in rc):
+                    continue
+            values = [self._to_slot(kind, g[f], out) for f, kind, _ in fields]
+            if _MISFIT in values:
+                continue  # any dictionary strings added above are still valid, just unused
+            for (_, _, slot), v in zip(fields, values):
+                row[slot] = v
+            if group == "decision":
+                codes = bytes(_REASON_TO_CODE[c] for c in g["reason_codes"])
+            del rec[group]
+            mask |= 1 << bit
+
+        row[1] = mask
+        row[2] = bools
+        payload = b"".join((
+            _RECORD.pack(*row),
+            bytes((len(codes),)),
+            codes,
+            *texts,
+            dumps(rec) if rec else b"",
+        ))
+        return _LEN.pack(len(payload)) + payload
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Same contract as write_jsonl: stamps `ts` unless the record has one."""
+        record = dict(record)
+        record["ts"] = record.get("ts", time.strftime(TS_FORMAT, time.gmtime()))
+        self.append(record)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Writes the record as-is (used by the JSONL converter)."""
+        with self._lock:
+            out: List[bytes] = []
+            n_strings = len(self._ids)
+            try:
+                entry = self._encode(record, out)
+            except Exception:
+                # Forget dictionary ids whose definitions were never written.
+                for value in [v for v, sid in self._ids.items() if sid >= n_strings]:
+                    del self._ids[value]
+                raise
+            out.append(entry)
+            self._f.write(b"".join(out))
+            self._f.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._f.close()
+
+    def __enter__(self) -> "CompactAuditWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class AuditLogReader:
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "rb")
+        size = os.fstat(self._f.fileno()).st_size
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        try:
+            if size < _HEADER.size:
+                raise ValueError(f"not a compact audit log: {path}")
+            magic, version, _ = _HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"not a compact audit log: {path}")
+            if version != FORMAT_VERSION:
+                raise ValueError(f"unsupported audit log format_version={version} (expected {FORMAT_VERSION})")
+        except ValueError:
+            self.close()
+            raise
+        self.version = version
+        self.strings: List[str] = []
+        self.valid_end = _HEADER.size
+
+    def _records(self) -> Iterator[Tuple[int, int]]:
+        """Yields (payload offset, payload end) per record; string entries are loaded on the way."""
+        mm = self._mm
+        end = len(mm)
+        off = _HEADER.size
+        unpack_len = _LEN.unpack_from
+        strings = self.strings
+        while off + 4 <= end:
+            (n,) = unpack_len(mm, off)
+            start = off + 4
+            stop = start + n
+            if n == 0 or stop > end:
+                return  # torn tail
+            off = self.valid_end = stop
+            if mm[start] == KIND_STRING:
+                _, sid = _STRING.unpack_from(mm, start)
+                if sid == len(strings):
+                    strings.append(mm[start + _STRING.size:stop].decode("utf-8"))
+            else:
+                yield start, stop
+
+    def load_strings(self) -> int:
+        """Reads the whole string dictionary; returns the end offset of the last complete entry."""
+        for _ in self._records():
+            pass
+        return self.valid_end
+
+    def _getter(self, field: str):
+        """(row, payload offset) -> value of one SCAN_FIELDS field."""
+        strings = self.strings
+        mm = self._mm
+        if field == "request_id":
+            return lambda row, _: _uuid_str(row[3]) if row[1] & 1 << _BIT_REQUEST_ID else None
+        if field == "ts":
+            return lambda row, _: row[4] if row[1] & 1 << _BIT_TS else None
+        if field == "decision.reason_codes":
+            def codes(row, start):
+                if not row[1] & 1 << _BIT_GROUP0:
+                    return None
+                off = start + _RECORD.size
+                return [_CODE_TO_REASON[c] for c in mm[off + 1:off + 1 + mm[off]]]
+            return codes
+
+        spec = {name: (kind, bit, slot) for name, kind, bit, slot in _COLUMN_PLAN}
+        spec.update({f"{group}.{f}": (kind, bit, slot)
+                     for group, bit, fields in _GROUP_PLAN for f, kind, slot in fields})
+        kind, bit, slot = spec[field]
+        present = 1 << bit
+        if kind == TEXT:
+            def text(row, start):
+                if not row[1] & present:
+                    return None
+                off = start + _RECORD.size
+                return _read_texts(mm, row[1], off + 1 + mm[off])[0][slot]
+            return text
+        if kind == BOOL:
+            return lambda row, _: bool(row[2] >> slot & 1) if row[1] & present else None
+        if kind == STR:
+            return lambda row, _: strings[row[slot]] if row[1] & present and row[slot] != NONE_U32 else None
+        if kind == FLOAT:
+            return lambda row, _: row[slot] if row[1] & present and not math.isnan(row[slot]) else None
+        return lambda row, _: row[slot] if row[1] & present and row[slot] != NONE_U32 else None
+
+    def _getters(self, fields: Iterable[str]) -> List[Tuple[str, Any]]:
+        fields = list(fields)
+        unknown = set(fields) - set(SCAN_FIELDS)
+        if unknown:
+            raise ValueError(f"not a scan field: {sorted(unknown)} (use records())")
+        return [(f, self._getter(f)) for f in fields]
+
+    def scan(self, fields: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Fixed columns only (see SCAN_FIELDS), without decoding JSON. Absent fields are
+        None; `ts` is epoch seconds. Use records() for everything else.
+        """
+        getters = self._getters(SCAN_FIELDS if fields is None else fields)
+        mm = self._mm
+        unpack = _RECORD.unpack_from
+        for start, _ in self._records():
+            row = unpack(mm, start)
+            yield {f: get(row, start) for f, get in getters}
+
+    def columns(self, fields: Iterable[str]) -> Dict[str, List[Any]]:
+        """scan() as column lists, e.g. for pandas.DataFrame(reader.columns([...]))."""
+        getters = self._getters(fields)
+        cols: Dict[str, List[Any]] = {f: [] for f, _ in getters}
+        plan = [(cols[f].append, get) for f, get in getters]
+        mm = self._mm
+        unpack = _RECORD.unpack_from
+        for start, _ in self._records():
+            row = unpack(mm, start)
+            for append, get in plan:
+                append(get(row, start))
+        return cols
+
+    def _decode(self, start: int, stop: int) -> Dict[str, Any]:
+        mm = self._mm
+        row = _RECORD.unpack_from(mm, start)
+        mask, bools = row[1], row[2]
+        strings = self.strings
+        rec: Dict[str, Any] = {}
+        if mask & 1 << _BIT_REQUEST_ID:
+            rec["request_id"] = _uuid_str(row[3])
+        off = start + _RECORD.size
+        n_codes = mm[off]
+        texts, extras_at = _read_texts(mm, mask, off + 1 + n_codes)
+        for name, kind, bit, slot in _COLUMN_PLAN:
+            if mask & 1 << bit:
+                if kind == BOOL:
+                    rec[name] = bool(bools >> slot & 1)
+                elif kind == TEXT:
+                    rec[name] = texts[slot]
+                else:
+                    rec[name] = _slot_value(kind, row[slot], strings)
+        for group, bit, fields in _GROUP_PLAN:
+            if mask & 1 << bit:
+                g = {f: _slot_value(kind, row[slot], strings) for f, kind, slot in fields}
+                if group == "decision":
+                    g["reason_codes"] = [_CODE_TO_REASON[c] for c in mm[off + 1:off + 1 + n_codes]]
+                rec[group] = g
+        if extras_at < stop:
+            rec.update(loads(mm[extras_at:stop]))
+        if mask & 1 << _BIT_TS:
+            rec["ts"] = time.strftime(TS_FORMAT, time.gmtime(row[4]))
+        return rec
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """Full records, equal to what was written."""
+        for start, stop in self._records():
+            yield self._decode(start, stop)
+
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        """The last `n` full records; walks the entry offsets but decodes only those."""
+        last = deque(self._records(), maxlen=max(0, n))
+        return [self._decode(start, stop) for start, stop in last]
+
+    def close(self) -> None:
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._f.close()
+
+    def __enter__(self) -> "AuditLogReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def is_compact(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Audit records from either format (JSONL or compact), detected by the file magic."""
+    if is_compact(path):
+        with AuditLogReader(path) as reader:
+            yield from reader.records()
+        return
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                try:
+                    yield loads(line)
+                except ValueError:
+                    continue  # torn last line
+
+
+def _tail_lines(f: BinaryIO, n: int, block: int = 1 << 16) -> List[bytes]:
+    """Last `n` non-blank lines of a binary file, read backwards in blocks from the end."""
+    pos = f.seek(0, os.SEEK_END)
+    chunks: Deque[bytes] = deque()
+    newlines = 0
+    lines: List[bytes] = []
+    while pos > 0:
+        step = min(block, pos)
+        pos -= step
+        f.seek(pos)
+        chunk = f.read(step)
+        chunks.appendleft(chunk)
+        newlines += chunk.count(b"\n")
+        if newlines > n or pos == 0:
+            # The first line may be cut off unless we reached the start of the file.
+            lines = [line for line in b"".join(chunks).split(b"\n") if line.strip()]
+            if pos == 0 or len(lines) > n:
+                break
+    return lines[-n:] if n > 0 else []
+
+
+def read_last_records(path: str, n: int) -> List[Dict[str, Any]]:
+    """
+    The last `n` audit records from either format, without decoding the rest:
+    JSONL is read backwards from the end, a compact log decodes only its tail.
+    """
+    if is_compact(path):
+        with AuditLogReader(path) as reader:
+            return reader.tail(n)
+    records = []
+    with open(path, "rb") as f:
+        for line in _tail_lines(f, n):
+            try:
+                records.append(loads(line))
+            except ValueError:
+                continue  # torn last line
+    return records
+
+
+def convert_jsonl(src: str, dst: str) -> int:
+    """Appends every record of JSONL `src` to compact log `dst`; returns the record count."""
+    n = 0
+    with CompactAuditWriter(dst) as writer:
+        for rec in read_records(src):
+            writer.append(rec)
+            n += 1
+    return n
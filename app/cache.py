@@ -1,40 +1,103 @@
 import time
 import hashlib
-from typing import Any, Dict, Optional, Tuple
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 class TTLCache:
+    """
+    LRU cache with a TTL, shared by request threads and chunk map threads:
+    every operation holds the lock, and eviction pops the least recently used
+    entry in O(1).
+    """
+
     def __init__(self, ttl_seconds: int = 3600, max_items: int = 500):
         self.ttl = ttl_seconds
         self.max_items = max_items
-        self._store: Dict[str, Tuple[float, Any]] = {}
-
-    def _evict_if_needed(self):
-        if len(self._store) <= self.max_items:
-            return
-        # Evict oldest
-        oldest_key = min(self._store.items(), key=lambda kv: kv[1][0])[0]
-        self._store.pop(oldest_key, None)
+        self._store: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
 
     @staticmethod
-    def make_key(model: str, system_text: str, user_text: str) -> str:
+    def make_key(model: str, system_text: str, user_text: str, output_format: str = "") -> str:
         h = hashlib.sha256()
         h.update(model.encode("utf-8"))
         h.update(b"\n")
         h.update(system_text.encode("utf-8"))
         h.update(b"\n")
         h.update(user_text.encode("utf-8"))
+        if output_format:
+            # Constrained (format=...) answers are cached apart from free-form ones.
+            h.update(b"\nformat:")
+            h.update(output_format.encode("utf-8"))
         return h.hexdigest()
 
     def get(self, key: str) -> Optional[Any]:
-        item = self._store.get(key)
-        if not item:
-            return None
-        ts, value = item
-        if time.time() - ts > self.ttl:
-            self._store.pop(key, None)
-            return None
-        return value
+        with self._lock:
+            item = self._store.get(key)
+            if item is None:
+                return None
+            ts, value = item
+            if time.time() - ts > self.ttl:
+                del self._store[key]
+                return None
+            self._store.move_to_end(key)
+            return value
 
     def set(self, key: str, value: Any) -> None:
-        self._store[key] = (time.time(), value)
-        self._evict_if_needed()
+        with self._lock:
+            self._store[key] = (time.time(), value)
+            self._store.move_to_end(key)
+            while len(self._store) > self.max_items:
+                self._store.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._store)
+
+
+def prompt_fingerprint(system_text: str, user_text: str, spec_fp: str, output_format: str = "") -> str:
+    """Model-independent id of (prompt, output spec, format constraint) for the pass-rate index."""
+    h = hashlib.sha256()
+    h.update(system_text.encode("utf-8"))
+    h.update(b"\n")
+    h.update(user_text.encode("utf-8"))
+    h.update(b"\n")
+    h.update(spec_fp.encode("utf-8"))
+    if output_format:
+        h.update(b"\nformat:")
+        h.update(output_format.encode("utf-8"))
+    return h.hexdigest()
+
+
+class PassRateIndex:
+    """
+    Validation pass/fail counts per (prompt fingerprint, model), bounded LRU.
+    Outlives TTLCache entries, so the router still knows a cheap answer failed
+    for this prompt after the cached answer itself expired.
+    """
+
+    def __init__(self, max_prompts: int = 10000):
+        self.max_prompts = max_prompts
+        self._store: "OrderedDict[str, Dict[str, List[int]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, prompt_fp: str, model: str, ok: bool) -> None:
+        with self._lock:
+            per_model = self._store.get(prompt_fp)
+            if per_model is None:
+                per_model = self._store[prompt_fp] = {}
+                if len(self._store) > self.max_prompts:
+                    self._store.popitem(last=False)
+            else:
+                self._store.move_to_end(prompt_fp)
+            counts = per_model.setdefault(model, [0, 0])
+            counts[0 if ok else 1] += 1
+
+    def counts(self, prompt_fp: str, model: str) -> Tuple[int, int]:
+        """Returns (passes, failures)."""
+        with self._lock:
+            c = (self._store.get(prompt_fp) or {}).get(model)
+            return (c[0], c[1]) if c else (0, 0)
+
+    def __len__(self) -> int:
+        return len(self._store)
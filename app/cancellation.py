@@ -0,0 +1,58 @@
+import threading
+import time
+from typing import Optional
+
+
+class GenerationCancelled(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class CancelToken:
+    """
+    Shared by everything working on one request (queue wait, every upstream call,
+    chunk workers). Fires on an explicit cancel() (client disconnect) or when the
+    monotonic deadline derived from constraints.max_latency_ms passes.
+    """
+
+    def __init__(self, deadline: Optional[float] = None):
+        self.deadline = deadline
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+
+    @classmethod
+    def from_max_latency_ms(cls, max_latency_ms: Optional[int]) -> "CancelToken":
+        if not max_latency_ms:
+            return cls()
+        return cls(deadline=time.monotonic() + max_latency_ms / 1000.0)
+
+    def cancel(self, reason: str) -> None:
+        if self.reason is None:
+            self.reason = reason
+        self._event.set()
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def is_cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline_exceeded")
+            return True
+        return False
+
+    def check(self) -> None:
+        if self.is_cancelled():
+            raise GenerationCancelled(self.reason or "cancelled")
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """Blocks until cancelled or the deadline passes (bounded by timeout); returns is_cancelled()."""
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        self._event.wait(max(0.0, timeout) if timeout is not None else None)
+        return self.is_cancelled()
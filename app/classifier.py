@@ -0,0 +1,149 @@
+"""
+Optional learned task-type classifier: hashed word n-grams + a linear (softmax) model in NumPy.
+
+It is only consulted by the router when the intent/keyword rules abstain or
+disagree (see rules.yaml `classifier`). Train it offline with eval/train_classifier.py.
+NumPy is optional: the router works without it as long as the stage is disabled.
+"""
+import re
+import zlib
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+FORMAT_VERSION = 1
+DEFAULT_N_FEATURES = 1 << 16
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9'\-;]*")
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("numpy is required for the task-type classifier (pip install numpy)")
+
+
+def feature_ids(text: str, n_features: int) -> List[int]:
+    """Stable (crc32) hashed unigrams + bigrams; Python's hash() is salted per process."""
+    tokens = _TOKEN.findall(text.lower())
+    mask = n_features - 1
+    ids = [zlib.crc32(t.encode("utf-8")) & mask for t in tokens]
+    ids.extend(zlib.crc32(f"{a} {b}".encode("utf-8")) & mask for a, b in zip(tokens, tokens[1:]))
+    return ids
+
+
+def _batch_ids(texts: Sequence[str], n_features: int):
+    rows, cols = [], []
+    for i, text in enumerate(texts):
+        ids = feature_ids(text, n_features)
+        cols.extend(ids)
+        rows.extend([i] * len(ids))
+    return np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+
+
+def _softmax(z):
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class TaskTypeClassifier:
+    def __init__(self, weights, bias, classes: Sequence[str], n_features: int):
+        _require_numpy()
+        self.W = np.asarray(weights, dtype=np.float32)
+        self.b = np.asarray(bias, dtype=np.float32)
+        self.classes = list(classes)
+        self.n_features = int(n_features)
+
+    def _logits(self, texts: Sequence[str]):
+        ids = [feature_ids(t, self.n_features) for t in texts]
+        logits = np.tile(self.b, (len(texts), 1))
+        lengths = np.fromiter((len(x) for x in ids), dtype=np.int64, count=len(ids))
+        nonempty = lengths > 0
+        if nonempty.any():
+            cols = np.fromiter((c for x in ids for c in x), dtype=np.int64, count=int(lengths.sum()))
+            starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))[nonempty]
+            logits[nonempty] += np.add.reduceat(self.W[cols], starts, axis=0)
+        return logits
+
+    def predict_proba(self, texts: Sequence[str]):
+        return _softmax(self._logits(texts))
+
+    def predict(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        """Batched inference: [(task_type, confidence), ...]."""
+        proba = self.predict_proba(texts)
+        best = proba.argmax(axis=1)
+        return [(self.classes[j], float(proba[i, j])) for i, j in enumerate(best)]
+
+    def predict_one(self, text: str) -> Tuple[str, float]:
+        return self.predict([text])[0]
+
+    def save(self, path: str) -> None:
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            p,
+            format_version=np.int64(FORMAT_VERSION),
+            W=self.W,
+            b=self.b,
+            classes=np.asarray(self.classes),
+            n_features=np.int64(self.n_features),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "TaskTypeClassifier":
+        _require_numpy()
+        p = Path(path)
+        if not p.exists():
+            raise FileNotFoundError(f"classifier model not found at: {p.resolve()}")
+        with np.load(p, allow_pickle=False) as data:
+            version = int(data["format_version"])
+            if version != FORMAT_VERSION:
+                raise ValueError(f"unsupported classifier format_version={version} (expected {FORMAT_VERSION})")
+            return cls(data["W"], data["b"], [str(c) for c in data["classes"]], int(data["n_features"]))
+
+
+def train(
+    texts: Sequence[str],
+    labels: Sequence[str],
+    classes: Optional[Iterable[str]] = None,
+    n_features: int = DEFAULT_N_FEATURES,
+    epochs: int = 200,
+    lr: float = 0.5,
+    l2: float = 1e-4,
+) -> TaskTypeClassifier:
+    """
+    Full-batch multinomial logistic regression with AdaGrad, on sparse hashed
+    features (gradients are scattered with np.add.at, no dense design matrix).
+    """
+    _require_numpy()
+    classes = list(classes) if classes is not None else sorted(set(labels))
+    index = {c: i for i, c in enumerate(classes)}
+    y = np.zeros((len(texts), len(classes)), dtype=np.float32)
+    y[np.arange(len(texts)), [index[label] for label in labels]] = 1.0
+
+    rows, cols = _batch_ids(texts, n_features)
+    W = np.zeros((n_features, len(classes)), dtype=np.float32)
+    b = np.zeros(len(classes), dtype=np.float32)
+    gW_acc = np.full_like(W, 1e-8)
+    gb_acc = np.full_like(b, 1e-8)
+    n = float(len(texts))
+
+    for _ in range(epochs):
+        logits = np.tile(b, (len(texts), 1))
+        np.add.at(logits, rows, W[cols])
+        err = (_softmax(logits) - y) / n
+
+        gW = l2 * W
+        np.add.at(gW, cols, err[rows])
+        gb = err.sum(axis=0)
+
+        gW_acc += gW * gW
+        gb_acc += gb * gb
+        W -= lr * gW / np.sqrt(gW_acc)
+        b -= lr * gb / np.sqrt(gb_acc)
+
+    return TaskTypeClassifier(W, b, classes, n_features)
@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from enum import IntFlag
+from typing import Any, Dict, List, Optional, Tuple
+
+from .schemas import TaskType, RouteDecision
+
+
+class ReasonCode(IntFlag):
+    RULE_TASK_TYPE_DEFAULT = 1
+    RULE_KEYWORD_MATCH = 2
+    RULE_INTENT_MATCH = 4
+    HEURISTIC_LONG_TEXT = 8
+    FALLBACK_DEFAULT = 16
+    HEURISTIC_LONG_TEXT_CHUNKED = 32
+    MODEL_CLASSIFIER = 64
+
+
+# Plain ints for the hot path (IntFlag arithmetic allocates new members).
+RULE_TASK_TYPE_DEFAULT = int(ReasonCode.RULE_TASK_TYPE_DEFAULT)
+RULE_KEYWORD_MATCH = int(ReasonCode.RULE_KEYWORD_MATCH)
+RULE_INTENT_MATCH = int(ReasonCode.RULE_INTENT_MATCH)
+HEURISTIC_LONG_TEXT = int(ReasonCode.HEURISTIC_LONG_TEXT)
+FALLBACK_DEFAULT = int(ReasonCode.FALLBACK_DEFAULT)
+HEURISTIC_LONG_TEXT_CHUNKED = int(ReasonCode.HEURISTIC_LONG_TEXT_CHUNKED)
+MODEL_CLASSIFIER = int(ReasonCode.MODEL_CLASSIFIER)
+
+_CODE_NAMES: Dict[int, str] = {int(c): c.name for c in ReasonCode}
+
+# Escalation steps appended to routing_reason, rendered only when needed.
+STEP_HARD_REASONING = 1
+STEP_TASK_TYPE_KEYWORDS = 2
+STEP_LONG_TEXT = 3
+STEP_RISK_HIGH = 4
+STEP_LONG_TEXT_CHUNKED = 5
+
+_STEP_TEXT: Dict[int, str] = {
+    STEP_HARD_REASONING: " | Escalated due to HARD_REASONING_KEYWORDS",
+    STEP_TASK_TYPE_KEYWORDS: " | Escalated due to task_type escalation keywords",
+    STEP_LONG_TEXT: " | Escalated due to {metric}>={threshold}",
+    STEP_RISK_HIGH: " | Escalated due to risk_level=high",
+    STEP_LONG_TEXT_CHUNKED: " | Chunked map-reduce on cheap tier due to {metric}>={threshold}",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Decision:
+    """
+    Internal routing decision, immutable: the decision memo hands the same object
+    to every request that hits it. Reason codes are kept as interned ints (ordered,
+    as the public schema lists them) plus a bit-flag set for membership tests;
+    routing_reason is rendered lazily. Convert with to_schema() at the API boundary.
+    """
+    chosen_tier: str
+    chosen_model_name: str
+    task_type: TaskType
+    codes: Tuple[int, ...]
+    flags: int
+    match_reason: Optional[str] = None  # None when task_type_hint was used
+    steps: Tuple[int, ...] = ()
+    long_text_threshold: int = 0
+    long_text_metric: str = "long_text_chars"
+
+    def has(self, code: ReasonCode) -> bool:
+        return bool(self.flags & code)
+
+    @property
+    def reason_codes(self) -> List[str]:
+        return [_CODE_NAMES[c] for c in self.codes]
+
+    @property
+    def routing_reason(self) -> str:
+        if self.match_reason is None:
+            parts = [f"Used task_type_hint={self.task_type.value}"]
+        else:
+            parts = [f"Inferred task_type={self.task_type.value} ({self.match_reason})"]
+        for step in self.steps:
+            parts.append(_STEP_TEXT[step].format(metric=self.long_text_metric, threshold=self.long_text_threshold))
+        return "".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same shape as RouteDecision.model_dump(mode="json"), without pydantic."""
+        return {
+            "chosen_tier": self.chosen_tier,
+            "chosen_model_name": self.chosen_model_name,
+            "task_type": self.task_type.value,
+            "reason_codes": self.reason_codes,
+            "routing_reason": self.routing_reason,
+        }
+
+    def to_schema(self) -> RouteDecision:
+        return RouteDecision(
+            chosen_tier=self.chosen_tier,
+            chosen_model_name=self.chosen_model_name,
+            task_type=self.task_type,
+            reason_codes=self.reason_codes,
+            routing_reason=self.routing_reason,
+        )
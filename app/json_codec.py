@@ -0,0 +1,75 @@
+"""
+One JSON encoder for HTTP responses and the audit log.
+
+Picks orjson, then msgspec, then the stdlib, so the service runs without the
+optional packages but gets the fast path when they are installed.
+Override with LLM_ROUTER_JSON=orjson|msgspec|stdlib.
+"""
+import json
+import os
+from functools import lru_cache
+from typing import Any, Callable, Hashable
+
+from fastapi.responses import Response
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _select_backend():
+    wanted = os.getenv("LLM_ROUTER_JSON", "").lower()
+
+    if wanted in ("", "orjson"):
+        try:
+            import orjson
+
+            opts = orjson.OPT_NON_STR_KEYS
+            fragment_cls = getattr(orjson, "Fragment", None)  # orjson >= 3.9
+
+            def dumps(obj: Any) -> bytes:
+                return orjson.dumps(obj, option=opts)
+
+            return "orjson", dumps, orjson.loads, fragment_cls
+        except ImportError:
+            pass
+
+    if wanted in ("", "msgspec"):
+        try:
+            import msgspec
+
+            encoder = msgspec.json.Encoder()
+            decoder = msgspec.json.Decoder()
+            return "msgspec", encoder.encode, decoder.decode, msgspec.Raw
+        except ImportError:
+            pass
+
+    return "stdlib", _stdlib_dumps, json.loads, None
+
+
+BACKEND, _dumps, loads, _FRAGMENT = _select_backend()
+dumps: Callable[[Any], bytes] = _dumps
+
+
+def dumps_str(obj: Any) -> str:
+    return _dumps(obj).decode("utf-8")
+
+
+@lru_cache(maxsize=1024)
+def fragment(value: Hashable) -> Any:
+    """
+    Pre-encodes a static value (rules version, model names, ...) once, so the
+    encoder splices the bytes in instead of re-encoding them on every record.
+    Falls back to the plain value when the backend has no raw-fragment type.
+    Only for values headed straight to the encoder: a fragment cannot be read back.
+    """
+    if _FRAGMENT is None:
+        return value
+    return _FRAGMENT(_dumps(value))
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return _dumps(content)
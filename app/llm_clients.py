@@ -1,13 +1,22 @@
+import json
+import socket
+import threading
 import time
 import requests
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+from .cancellation import CancelToken, GenerationCancelled
+
 
 class OllamaChatClient:
     """
     Minimal Ollama client via HTTP API.
     Assumes Ollama runs on http://localhost:11434
+
+    Responses are streamed so a request can be abandoned mid-generation: when the
+    CancelToken fires (client disconnect or deadline), the connection is closed,
+    which makes Ollama stop generating instead of burning GPU until timeout_s.
     """
 
     def __init__(self, base_url: str = "http://localhost:11434",timeout_s: int = 180):
@@ -21,35 +30,112 @@ class OllamaChatClient:
         retry=retry_if_exception_type((requests.Timeout, requests.ConnectionError, requests.HTTPError)),
     )
 
-    def chat(self, model: str, user_text: str, system_text: str = "") -> Tuple[str, int, Dict[str, Any]]:
+    def chat(
+        self,
+        model: str,
+        user_text: str,
+        system_text: str = "",
+        cancel: Optional[CancelToken] = None,
+        format: Optional[Any] = None,
+    ) -> Tuple[str, int, Dict[str, Any]]:
+        """
+        `format` is passed through to Ollama's constrained decoding: "json" or a JSON Schema dict.
+        """
+        if cancel is not None:
+            cancel.check()
         t0 = time.perf_counter()
 
         payload = {
             "model": model,
             "messages": [],
-            "stream": False,
+            "stream": True,
         }
+        if format is not None:
+            payload["format"] = format
         if system_text:
             payload["messages"].append({"role": "system", "content": system_text})
         payload["messages"].append({"role": "user", "content": user_text})
 
-        resp = requests.post(
-            f"{self.base_url}/api/chat",
-            json=payload,
-            timeout=self.timeout_s,
-        )
-        resp.raise_for_status()
+        timeout = self.timeout_s
+        remaining = cancel.remaining() if cancel is not None else None
+        if remaining is not None:
+            timeout = max(0.001, min(timeout, remaining))
+
+        try:
+            resp = requests.post(
+                f"{self.base_url}/api/chat",
+                json=payload,
+                timeout=timeout,
+                stream=True,
+            )
+        except requests.RequestException as e:
+            if cancel is not None and cancel.is_cancelled():
+                raise GenerationCancelled(cancel.reason) from e
+            raise
+
+        stop = threading.Event()
+        if cancel is not None:
+            threading.Thread(target=self._watch, args=(cancel, resp, stop), daemon=True).start()
+
+        parts = []
+        final: Dict[str, Any] = {}
+        try:
+            resp.raise_for_status()
+            for line in resp.iter_lines():
+                if cancel is not None:
+                    cancel.check()
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise RuntimeError(f"ollama_error: {data['error']}")
+                parts.append(data.get("message", {}).get("content", ""))
+                if data.get("done"):
+                    final = data
+                    break
+        except GenerationCancelled:
+            raise
+        except Exception as e:
+            if cancel is not None and cancel.is_cancelled():
+                raise GenerationCancelled(cancel.reason) from e
+            raise
+        finally:
+            stop.set()
+            resp.close()
 
-        data = resp.json()
         latency_ms = int((time.perf_counter() - t0) * 1000)
-        answer = data.get("message", {}).get("content", "")
+        answer = "".join(parts)
 
-        usage = {"input_tokens": None, "output_tokens": None, "total_tokens": None}
+        input_tokens = final.get("prompt_eval_count")
+        output_tokens = final.get("eval_count")
+        usage = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens if input_tokens is not None and output_tokens is not None else None,
+        }
         return answer, latency_ms, usage
 
+    @staticmethod
+    def _watch(cancel: CancelToken, resp: requests.Response, stop: threading.Event) -> None:
+        # Unblocks a read that is waiting on the socket (e.g. during prompt processing).
+        while not stop.is_set():
+            if cancel.wait(0.2):
+                if not stop.is_set():
+                    _abort(resp)
+                return
+
     def list_models(self) -> Dict[str, Any]:
         resp = requests.get(f"{self.base_url}/api/tags", timeout=30)
         resp.raise_for_status()
         return resp.json()
 
 
+def _abort(resp: requests.Response) -> None:
+    conn = getattr(resp.raw, "_connection", None)
+    sock = getattr(conn, "sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    resp.close()
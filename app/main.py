@@ -1,28 +1,119 @@
 from fastapi import FastAPI
 from .schemas import RouteRequest, RouteResponse, UsageStats
 from .config import load_rules
-from .router import decide_route
+from .router import decide_fast, compile_rules, invalidate_rules
+from .decision import Decision, ReasonCode
+from .chunking import run_map_reduce
 from .llm_clients import OllamaChatClient
 from .logging_utils import write_jsonl
+from .auditlog import CompactAuditWriter
+from .json_codec import FastJSONResponse, fragment
+from .tenancy import TenantLimiter, FairQueue, QueueTimeout
+from .cancellation import CancelToken, GenerationCancelled
+from .stats import RollingStats, StructuredOutputStats
+from .warming import CacheWarmer
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import json
+from contextlib import asynccontextmanager
+import math
 import uuid
 import time
-from .validators import validate_output
+from typing import Any, Dict, Optional, Tuple
+from .validators import validate_output, spec_fingerprint, repair_json, format_constraint
 from fastapi import FastAPI, HTTPException
-from .cache import TTLCache
+from .cache import TTLCache, PassRateIndex, prompt_fingerprint
 
 
 CACHE = TTLCache(ttl_seconds=3600, max_items=500)
-app = FastAPI(title="LLM Router", version="0.1.0")
+
+
+@asynccontextmanager
+async def lifespan(app_: FastAPI):
+    # Warming runs in its own thread; /health?ready=true reports when it is over.
+    WARMER.start(LOG_PATH, _warm)
+    yield
+    WARMER.stop()
+
+
+app = FastAPI(title="LLM Router", version="0.1.0", default_response_class=FastJSONResponse, lifespan=lifespan)
 
 # Load rules once at startup (Day 1). Later you can add reload endpoint or file watcher.
-RULES = load_rules("rules.yaml")
+RULES_PATH = "rules.yaml"
+RULES = load_rules(RULES_PATH)
 LLM = OllamaChatClient()
-LOG_PATH = "logs/router.jsonl"
+AUDIT_FORMAT = (RULES.get("audit") or {}).get("format", "jsonl")
+LOG_PATH = "logs/router.rlog" if AUDIT_FORMAT == "compact" else "logs/router.jsonl"
+AUDIT_WRITER = CompactAuditWriter(LOG_PATH) if AUDIT_FORMAT == "compact" else None
+LOG_TASK_TEXT = bool((RULES.get("audit") or {}).get("log_task_text", False))
+RULES_VERSION = RULES.get("version")
+TENANTS = TenantLimiter(RULES.get("tenancy", {}))
+QUEUE = FairQueue(
+    max_concurrent=(RULES.get("tenancy") or {}).get("max_concurrent_executions", 4),
+    max_wait_s=(RULES.get("tenancy") or {}).get("max_queue_wait_ms", 120000) / 1000.0,
+)
+
+VALIDATION_CACHE_ON = bool((RULES.get("validation_cache") or {}).get("enabled", False))
+SKIP_CHEAP_AFTER_FAILURES = int((RULES.get("validation_cache") or {}).get("skip_cheap_after_failures", 2))
+PASS_RATES = PassRateIndex(max_prompts=int((RULES.get("validation_cache") or {}).get("max_prompts", 10000)))
+
+STRUCTURED_CFG = RULES.get("structured_output") or {}
+CONSTRAIN_JSON = bool(STRUCTURED_CFG.get("constrain", False))
+REPAIR_JSON = bool(STRUCTURED_CFG.get("repair", False))
+STRUCTURED = StructuredOutputStats()
+
+DISCONNECT_POLL_S = 0.5
+STATS = RollingStats()
+WARMER = CacheWarmer(RULES.get("cache_warming"))
+
+SYSTEM_TEXT = (
+    "You are a reliable assistant. Follow instructions carefully. "
+    "If the user asks for structured output, comply strictly."
+)
+
+
+# Repeated static values, pre-encoded for the JSONL line only: records stay plain
+# for the compact writer (which columnizes them) and for STATS.
+_JSONL_FRAGMENT_FIELDS = ("rules_version", "final_model_name")
+
+
+def _audit(record: Dict[str, Any]) -> None:
+    if AUDIT_WRITER is not None:
+        AUDIT_WRITER.write(record)
+    else:
+        line = dict(record)
+        for k in _JSONL_FRAGMENT_FIELDS:
+            if k in line:
+                line[k] = fragment(line[k])
+        write_jsonl(LOG_PATH, line)
+    STATS.record(record)
+
+
+def _task_fields(req: RouteRequest) -> dict:
+    if not LOG_TASK_TEXT:
+        return {}
+    # Enough of the request to re-run it (eval/replay.py, cache warming).
+    output_spec = req.output_spec.model_dump(exclude_defaults=True)
+    return {"task": req.task, **({"output_spec": output_spec} if output_spec else {})}
 
 
 @app.get("/health")
-def health():
-    return {"status": "ok", "service": "llm-router", "version": app.version}
+def health(response: Response, ready: bool = False):
+    """
+    Liveness by default. Readiness probes use ?ready=true: 503 until cache
+    warming (rules.yaml cache_warming) is over.
+    """
+    is_ready = WARMER.ready
+    if ready and not is_ready:
+        response.status_code = 503
+    return {
+        "status": "ok",
+        "service": "llm-router",
+        "version": app.version,
+        "ready": is_ready,
+        "cache_warming": WARMER.snapshot(),
+    }
 
 @app.get("/models")
 def models():
@@ -31,28 +122,358 @@ def models():
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"ollama_list_models_failed: {e}")
 
+def _format_key(output_format: Optional[Any]) -> str:
+    return "" if output_format is None else json.dumps(output_format, sort_keys=True, separators=(",", ":"))
+
+
+def _call_with_cache(
+    model_name: str,
+    user_text: str,
+    system_text: str = SYSTEM_TEXT,
+    cancel: Optional[CancelToken] = None,
+    output_format: Optional[Any] = None,
+):
+    cache_key = TTLCache.make_key(
+        model=model_name, system_text=system_text, user_text=user_text, output_format=_format_key(output_format)
+    )
+    cached = CACHE.get(cache_key)
+    if cached is not None:
+        answer_ = cached.get("answer", "")
+        usage_ = cached.get("usage") or {"input_tokens": None, "output_tokens": None, "total_tokens": None}
+        llm_latency_ms_ = 0
+        hit = True
+    else:
+        answer_, llm_latency_ms_, usage_ = LLM.chat(
+            model=model_name,
+            user_text=user_text,
+            system_text=system_text,
+            cancel=cancel,
+            format=output_format,
+        )
+        # "validation" exists from the start, so concurrent requests only ever set keys in it.
+        CACHE.set(cache_key, {"answer": answer_, "usage": usage_, "validation": {}})
+        hit = False
+    return answer_, llm_latency_ms_, usage_, hit
+
+
+def _known_failure(
+    model: str, user_text: str, spec_fp: str, prompt_fp: str, fmt_key: str = ""
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Returns (source, reason) when the answer of `model` for this prompt is known
+    to fail this output spec: from the cached entry's stored validation outcome,
+    or from the pass-rate index once the entry is gone.
+    """
+    cached = CACHE.get(TTLCache.make_key(model=model, system_text=SYSTEM_TEXT, user_text=user_text, output_format=fmt_key))
+    if cached is not None:
+        outcome = (cached.get("validation") or {}).get(spec_fp)
+        if outcome is not None:
+            return (None, None) if outcome[0] else ("validation_cache", outcome[1])
+        return None, None
+    passes, failures = PASS_RATES.counts(prompt_fp, model)
+    if passes == 0 and failures >= SKIP_CHEAP_AFTER_FAILURES:
+        return "pass_rate_index", f"known_failure:{failures}x"
+    return None, None
+
+
+def _validate_with_cache(
+    model: str, user_text: str, answer: str, spec_fp: str, validate, fmt_key: str = ""
+) -> Tuple[bool, str, Optional[str], bool]:
+    """
+    Reuses the validation outcome stored on the cache entry; returns
+    (ok, reason, repaired_answer, was_cached).
+    """
+    cached = CACHE.get(TTLCache.make_key(model=model, system_text=SYSTEM_TEXT, user_text=user_text, output_format=fmt_key))
+    if cached is not None:
+        outcome = cached["validation"].get(spec_fp)
+        if outcome is not None:
+            return outcome[0], outcome[1], outcome[2], True
+    ok, reason, repaired = validate(answer, model)
+    if cached is not None:
+        cached["validation"][spec_fp] = (ok, reason, repaired)
+    return ok, reason, repaired, False
+
+
+def _execute(
+    req: RouteRequest, decision: Decision, cancel: Optional[CancelToken] = None, record_stats: bool = True
+) -> Dict[str, Any]:
+    """
+    Runs the execution strategy for a decision (direct, cheap-first + verify, or
+    chunked map-reduce) and returns the fields the response and audit log need.
+    Raises GenerationCancelled as soon as `cancel` fires. With record_stats=False
+    (cache warming) the pass-rate index and structured-output stats are left alone.
+    """
+    spec = req.output_spec
+    # JSON-constrained decoding for full-task calls (map-reduce chunk calls stay free-form).
+    constrain = spec.output_format == "json" and (CONSTRAIN_JSON if spec.constrained is None else spec.constrained)
+    output_format = format_constraint(spec.required_json_keys, spec.json_schema) if constrain else None
+    fmt_key = _format_key(output_format)
+
+    def call(model_name: str, user_text: str, system_text: str = SYSTEM_TEXT, structured: bool = False):
+        return _call_with_cache(model_name, user_text, system_text, cancel, output_format if structured else None)
+
+    escalated = False
+    escalation_reason = None
+    # latency_ms_llm is the final model's call(s); on escalation the initial model's
+    # call(s) are reported separately as latency_ms_llm_initial.
+    llm_latency_ms_initial = None
+    cache_hit_first = False
+    cache_hit_escalation = False
+    json_repaired = False
+
+    def check(answer_: str):
+        return validate_output(
+            answer=answer_,
+            output_format=spec.output_format,
+            required_json_keys=spec.required_json_keys,
+            max_words=spec.max_words,
+            json_schema=spec.json_schema,
+        )
+
+    def validate(answer_: str, model_: str, constrained: bool = constrain):
+        """(ok, reason, repaired_answer): tries a local JSON repair before reporting invalid_json."""
+        ok_, reason_ = check(answer_)
+        repaired_ = None
+        attempted = not ok_ and REPAIR_JSON and reason_ == "invalid_json"
+        if attempted:
+            obj = repair_json(answer_)
+            if obj is not None:
+                fixed = json.dumps(obj, ensure_ascii=False)
+                ok_, reason_ = check(fixed)
+                repaired_ = fixed if ok_ else None
+        if record_stats and spec.output_format == "json":
+            STRUCTURED.record(model_, constrained, valid=repaired_ is None and ok_,
+                              repair_attempted=attempted, repaired=repaired_ is not None)
+        return ok_, reason_, repaired_
+
+    strong_model = RULES["models"]["strong"]["name"]
+    chunked = None
+    validation_cached = False
+    validation_skipped = None
+
+    if decision.has(ReasonCode.HEURISTIC_LONG_TEXT_CHUNKED):
+        # --- Long input: map-reduce on cheap, escalate the full text only if the merge fails validation ---
+        initial_model = decision.chosen_model_name
+        chunked = run_map_reduce(
+            task_text=req.task,
+            task_type=decision.task_type.value,
+            model=initial_model,
+            call=call,
+            cfg=RULES.get("chunking", {}),
+        )
+        answer, llm_latency_ms, usage = chunked.pop("answer"), chunked["latency_ms_llm"], chunked.pop("usage")
+        cache_hit_first = chunked["chunk_cache_hits"] == chunked["chunks"] and chunked["reduce_cache_hit"]
+        final_model = initial_model
+
+        ok, reason, repaired = validate(answer, final_model, constrained=False)
+        if repaired is not None:
+            answer, json_repaired = repaired, True
+        if not ok and final_model != strong_model:
+            escalated = True
+            escalation_reason = reason
+            llm_latency_ms_initial = llm_latency_ms
+            answer, llm_latency_ms, usage, cache_hit_escalation = call(strong_model, req.task, structured=True)
+            final_model = strong_model
+    else:
+        # --- Decide initial model (mode-aware) ---
+        initial_model = decision.chosen_model_name
+
+        if req.execution_mode == "cheap_first_verify":
+            cheap_first_types = {"summarization", "extraction_structuring", "rewrite_formatting"}
+            if decision.task_type.value in cheap_first_types:
+                initial_model = RULES["models"]["cheap"]["name"]
+
+        verify = req.execution_mode == "cheap_first_verify"
+        if verify and VALIDATION_CACHE_ON:
+            spec_fp = spec_fingerprint(spec.output_format, spec.required_json_keys, spec.max_words, spec.json_schema)
+            prompt_fp = prompt_fingerprint(SYSTEM_TEXT, req.task, spec_fp, fmt_key)
+
+            # --- Known-failing cheap answer: go straight to strong ---
+            if initial_model != strong_model:
+                validation_skipped, known_reason = _known_failure(initial_model, req.task, spec_fp, prompt_fp, fmt_key)
+
+        if validation_skipped is not None:
+            escalated = True
+            escalation_reason = known_reason
+            answer, llm_latency_ms, usage, cache_hit_escalation = call(strong_model, req.task, structured=True)
+            final_model = strong_model
+        else:
+            # --- First call (ALWAYS executed) ---
+            answer, llm_latency_ms, usage, cache_hit_first = call(initial_model, req.task, structured=True)
+            final_model = initial_model
+
+            # --- Validate (repairing near-valid JSON) + optional escalation (only in cheap_first_verify) ---
+            if verify:
+                if VALIDATION_CACHE_ON:
+                    ok, reason, repaired, validation_cached = _validate_with_cache(
+                        initial_model, req.task, answer, spec_fp, validate, fmt_key
+                    )
+                    if record_stats:
+                        PASS_RATES.record(prompt_fp, initial_model, ok)
+                else:
+                    ok, reason, repaired = validate(answer, initial_model)
+                if repaired is not None:
+                    answer, json_repaired = repaired, True
+
+                if not ok and final_model != strong_model:
+                    escalated = True
+                    escalation_reason = reason
+
+                    llm_latency_ms_initial = llm_latency_ms
+                    answer, llm_latency_ms_strong, usage, cache_hit_escalation = call(strong_model, req.task, structured=True)
+
+                    # If escalation happened and we actually called strong (non-cache), keep its latency
+                    # If it was cached, llm_latency_ms_strong == 0
+                    llm_latency_ms = llm_latency_ms_strong
+                    final_model = strong_model
+
+    return {
+        "answer": answer,
+        "final_model": final_model,
+        "escalated": escalated,
+        "escalation_reason": escalation_reason,
+        "cache_hit_first": cache_hit_first,
+        "cache_hit_escalation": cache_hit_escalation,
+        "latency_ms_llm": llm_latency_ms,
+        "latency_ms_llm_initial": llm_latency_ms_initial,
+        "usage": usage,
+        "chunked": chunked,
+        "validation_cached": validation_cached,
+        "validation_skipped": validation_skipped,
+        "format_constrained": constrain,
+        "json_repaired": json_repaired,
+    }
+
+
+def _reject(request_id: str, req: RouteRequest, tenant: str, reason: str, status_code: int, headers=None):
+    _audit({
+        "request_id": request_id,
+        "mode": "rejected",
+        "rules_version": RULES_VERSION,
+        "tenant": tenant,
+        "reject_reason": reason,
+        "task_len_chars": len(req.task),
+        "risk_level": req.constraints.risk_level,
+        "execute": req.execute,
+    })
+    raise HTTPException(status_code=status_code, detail=reason, headers=headers)
+
+
+def _log_cancelled(request_id: str, req: RouteRequest, tenant: str, decision: Decision, reason: str, stage: str, t0: float):
+    _audit({
+        "request_id": request_id,
+        "mode": "cancelled",
+        "rules_version": RULES_VERSION,
+        "tenant": tenant,
+        "cancel_reason": reason,
+        "cancel_stage": stage,
+        "execution_mode": req.execution_mode,
+        "task_len_chars": len(req.task),
+        "risk_level": req.constraints.risk_level,
+        "max_latency_ms": req.constraints.max_latency_ms,
+        "decision": decision.to_dict(),
+        "latency_ms_total": max(1, round((time.perf_counter() - t0) * 1000)),
+    })
+
+
+async def _until_done(work, request: Request, cancel: CancelToken):
+    """Awaits `work`, cancelling the request's token if the client goes away meanwhile."""
+    work = asyncio.ensure_future(work)
+    while not work.done():
+        await asyncio.wait({work}, timeout=DISCONNECT_POLL_S)
+        if not work.done() and not cancel.is_cancelled() and await request.is_disconnected():
+            cancel.cancel("client_disconnect")
+    return work.result()
+
+
+def _cancelled_response(e: GenerationCancelled) -> Response:
+    if e.reason == "client_disconnect":
+        # Nobody is listening; 499 only shows up in access logs.
+        return Response(status_code=499)
+    raise HTTPException(status_code=504, detail=e.reason)
+
+
 @app.post("/route", response_model=RouteResponse)
-def route(req: RouteRequest):
+async def route(req: RouteRequest, request: Request):
+    """
+    Rate limiting and fair-queue admission happen here on the event loop, so a
+    request waiting for an execution slot holds no threadpool thread; routing
+    and execution then run in the threadpool. Meanwhile this coroutine watches
+    for the client going away and cancels the request's token, which aborts the
+    queue wait or the upstream generation. constraints.max_latency_ms is
+    enforced through the same token.
+    """
     request_id = str(uuid.uuid4())
     t0 = time.perf_counter()
+    cancel = CancelToken.from_max_latency_ms(req.constraints.max_latency_ms if req.execute else None)
+    tenant = TENANTS.tenant_of(req.metadata)
+
+    # Decision-only calls are cheap and never queue, so only executions are rate limited.
+    if TENANTS.enabled and req.execute:
+        allowed, retry_after_s = TENANTS.try_acquire(tenant)
+        if not allowed:
+            _reject(request_id, req, tenant, "rate_limited", 429, {"Retry-After": str(math.ceil(retry_after_s))})
+
+    # --- Wait for an execution slot (weighted fair queue across tenants) ---
+    decision = None
+    queue_wait_ms = 0
+    queued = TENANTS.enabled and req.execute
+    if queued:
+        decision = decide_fast(req.task, req.task_type_hint, req.constraints.risk_level, RULES)
+        try:
+            queue_wait_ms = await _until_done(QUEUE.acquire_async(tenant, TENANTS.weight(tenant), cancel), request, cancel)
+        except QueueTimeout as e:
+            TENANTS.record_queue(tenant, int(QUEUE.max_wait_s * 1000), timed_out=True)
+            _reject(request_id, req, tenant, str(e), 503)
+        except GenerationCancelled as e:
+            _log_cancelled(request_id, req, tenant, decision, e.reason, "queue", t0)
+            return _cancelled_response(e)
+        TENANTS.record_queue(tenant, queue_wait_ms)
+
+    try:
+        work = run_in_threadpool(_route, req, request_id, t0, cancel, tenant, decision, queue_wait_ms)
+        return await _until_done(work, request, cancel)
+    except GenerationCancelled as e:
+        return _cancelled_response(e)
+    finally:
+        if queued:
+            QUEUE.release()
+
 
-    decision = decide_route(req, RULES)
+def _route(
+    req: RouteRequest,
+    request_id: str,
+    t0: float,
+    cancel: CancelToken,
+    tenant: str,
+    decision: Optional[Decision] = None,
+    queue_wait_ms: int = 0,
+) -> RouteResponse:
+    """Routing + execution for an admitted request (route() already holds its queue slot)."""
+    if decision is None:
+        decision = decide_fast(req.task, req.task_type_hint, req.constraints.risk_level, RULES)
+    # Token estimate is cached from the decision; predictions are for the chosen model.
+    preflight = compile_rules(RULES).tokens.preflight(req.task, decision.chosen_model_name)
 
     # --- Decision-only mode ---
     if not req.execute:
         latency_ms = int((time.perf_counter() - t0) * 1000)
-        write_jsonl(LOG_PATH, {
+        _audit({
             "request_id": request_id,
             "mode": "decision_only",
+            "rules_version": RULES_VERSION,
+            "tenant": tenant,
             "task_len_chars": len(req.task),
             "task_type_hint": req.task_type_hint.value if req.task_type_hint else None,
             "risk_level": req.constraints.risk_level,
-            "decision": decision.model_dump(),
+            "decision": decision.to_dict(),
+            "preflight": preflight,
             "latency_ms_total": latency_ms,
+            **_task_fields(req),
         })
         return RouteResponse(
             request_id=request_id,
-            decision=decision,
+            decision=decision.to_schema(),
             answer=None,
             latency_ms=latency_ms,
             usage=None,
@@ -61,104 +482,123 @@ def route(req: RouteRequest):
             final_model_name=None,
         )
 
-    # --- Shared variables ---
-    system_text = (
-        "You are a reliable assistant. Follow instructions carefully. "
-        "If the user asks for structured output, comply strictly."
-    )
-
-    escalated = False
-    escalation_reason = None
-    cache_hit_first = False
-    cache_hit_escalation = False
-
-    # Helper: call model with cache
-    def call_with_cache(model_name: str):
-        nonlocal cache_hit_first, cache_hit_escalation
-        cache_key = TTLCache.make_key(model=model_name, system_text=system_text, user_text=req.task)
-        cached = CACHE.get(cache_key)
-        if cached is not None:
-            answer_ = cached.get("answer", "")
-            usage_ = cached.get("usage") or {"input_tokens": None, "output_tokens": None, "total_tokens": None}
-            llm_latency_ms_ = 0
-            hit = True
-        else:
-            answer_, llm_latency_ms_, usage_ = LLM.chat(
-                model=model_name,
-                user_text=req.task,
-                system_text=system_text
-            )
-            CACHE.set(cache_key, {"answer": answer_, "usage": usage_})
-            hit = False
-        return answer_, llm_latency_ms_, usage_, hit
-
-    # --- Decide initial model (mode-aware) ---
-    initial_model = decision.chosen_model_name
-
-    if req.execution_mode == "cheap_first_verify":
-        cheap_first_types = {"summarization", "extraction_structuring", "rewrite_formatting"}
-        if decision.task_type.value in cheap_first_types:
-            initial_model = RULES["models"]["cheap"]["name"]
-
-    # --- First call (ALWAYS executed) ---
-    answer, llm_latency_ms, usage, cache_hit_first = call_with_cache(initial_model)
-    final_model = initial_model
-
-    # --- Validate + optional escalation (only in cheap_first_verify) ---
-    if req.execution_mode == "cheap_first_verify":
-        ok, reason = validate_output(
-            answer=answer,
-            output_format=req.output_spec.output_format,
-            required_json_keys=req.output_spec.required_json_keys,
-            max_words=req.output_spec.max_words,
-        )
-
-        if not ok and final_model != RULES["models"]["strong"]["name"]:
-            escalated = True
-            escalation_reason = reason
-
-            strong_model = RULES["models"]["strong"]["name"]
-            answer, llm_latency_ms_strong, usage, cache_hit_escalation = call_with_cache(strong_model)
-
-            # If escalation happened and we actually called strong (non-cache), keep its latency
-            # If it was cached, llm_latency_ms_strong == 0
-            llm_latency_ms = llm_latency_ms_strong
-            final_model = strong_model
+    try:
+        result = _execute(req, decision, cancel)
+    except GenerationCancelled as e:
+        _log_cancelled(request_id, req, tenant, decision, e.reason, "execute", t0)
+        raise
 
     total_latency_ms = max(1, round((time.perf_counter() - t0) * 1000))
+    answer = result["answer"]
+    usage = result["usage"]
 
     # --- Log ---
-    write_jsonl(LOG_PATH, {
+    _audit({
         "request_id": request_id,
         "mode": "execute",
+        "rules_version": RULES_VERSION,
+        "tenant": tenant,
         "execution_mode": req.execution_mode,
         "task_len_chars": len(req.task),
         "task_type_hint": req.task_type_hint.value if req.task_type_hint else None,
         "risk_level": req.constraints.risk_level,
-        "decision": decision.model_dump(),
-        "final_model_name": final_model,
-        "escalated": escalated,
-        "escalation_reason": escalation_reason,
-        "cache_hit_first": cache_hit_first,
-        "cache_hit_escalation": cache_hit_escalation,
-        "latency_ms_llm": llm_latency_ms,
+        "decision": decision.to_dict(),
+        "preflight": preflight,
+        "final_model_name": result["final_model"],
+        "escalated": result["escalated"],
+        "escalation_reason": result["escalation_reason"],
+        "cache_hit_first": result["cache_hit_first"],
+        "cache_hit_escalation": result["cache_hit_escalation"],
+        "queue_wait_ms": queue_wait_ms,
+        "latency_ms_llm": result["latency_ms_llm"],
+        "latency_ms_llm_initial": result["latency_ms_llm_initial"],
         "latency_ms_total": total_latency_ms,
         "usage": usage,
         "answer_len_chars": len(answer or ""),
+        "chunked": result["chunked"],
+        "validation_cached": result["validation_cached"],
+        "validation_skipped": result["validation_skipped"],
+        "format_constrained": result["format_constrained"],
+        "json_repaired": result["json_repaired"],
+        **_task_fields(req),
     })
 
     return RouteResponse(
         request_id=request_id,
-        decision=decision,
+        decision=decision.to_schema(),
         answer=answer,
         latency_ms=total_latency_ms,
         usage=UsageStats(**usage) if usage else None,
-        escalated=escalated,
-        escalation_reason=escalation_reason,
-        final_model_name=final_model,
+        escalated=result["escalated"],
+        escalation_reason=result["escalation_reason"],
+        final_model_name=result["final_model"],
     )
 
 
+@app.get("/stats")
+def stats():
+    snapshot = STATS.snapshot()
+    memo = compile_rules(RULES).memo
+    snapshot["decision_memo"] = memo.stats() if memo is not None else None
+    snapshot["structured_output"] = STRUCTURED.snapshot()
+    return snapshot
+
+
+@app.post("/rules/reload")
+def reload_rules():
+    """
+    Re-reads rules.yaml and swaps in the new routing rules; the old compiled rules,
+    decision memo and template index are dropped. Tenancy, queue and cache
+    settings are read at startup only.
+    """
+    global RULES, RULES_VERSION
+    try:
+        new_rules = load_rules(RULES_PATH)
+        compile_rules(new_rules)  # fail here, before swapping, if the new rules don't compile
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"rules reload failed: {e}")
+    old_rules = RULES
+    RULES, RULES_VERSION = new_rules, new_rules.get("version")
+    invalidate_rules(old_rules)
+    return {"status": "reloaded", "rules_version": new_rules.get("version")}
+
+
+@app.get("/tenants")
+def tenants(limit: int = 50, sort_by: str = "rejected"):
+    return {"queue": QUEUE.snapshot(), "tenants": TENANTS.top(limit=limit, by=sort_by)}
+
+
+@app.get("/tenants/{tenant_id}")
+def tenant_stats(tenant_id: str):
+    stats = TENANTS.stats(tenant_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"unknown_tenant: {tenant_id}")
+    return {"tenant": tenant_id, **stats}
+
+
+def _warm(payload: Dict[str, Any]) -> bool:
+    """
+    Cache warming: re-runs one mined request through _execute, as the low-weight
+    warmer tenant when fair queuing is on. Neither audited nor counted in the
+    pass-rate index or /stats, so replayed traffic never skews them or the next
+    warm-up. Returns True if a model was called.
+    """
+    req = RouteRequest(**payload)
+    decision = decide_fast(req.task, req.task_type_hint, req.constraints.risk_level, RULES)
+    if TENANTS.enabled:
+        QUEUE.acquire(WARMER.tenant, WARMER.weight)
+        try:
+            result = _execute(req, decision, record_stats=False)
+        finally:
+            QUEUE.release()
+    else:
+        result = _execute(req, decision, record_stats=False)
+    hits = [] if result["validation_skipped"] is not None else [result["cache_hit_first"]]
+    if result["escalated"]:
+        hits.append(result["cache_hit_escalation"])
+    return not all(hits)
+
+
 @app.post("/warmup")
 def warmup():
     try:
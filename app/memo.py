@@ -0,0 +1,123 @@
+"""
+Decision memoization for templated traffic (rules.yaml `decision_memo`).
+
+DecisionMemo caches whole Decisions per (normalized task, hint, risk, rules version).
+TemplateIndex is a radix trie over known instruction prefixes: for a task that
+starts with one, the phrase matches inside the prefix are precomputed, so the
+router only scans the boundary + variable suffix.
+
+Both hang off CompiledRules, so reloading rules.yaml drops them with the old compile.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, FrozenSet, Iterable, Optional, Tuple
+
+
+class DecisionMemo:
+    def __init__(self, max_items: int = 10000):
+        self.max_items = max(1, int(max_items))
+        self._store: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(task_l: str, task_len: int, hint: Any, risk_level: str, rules_version: Any) -> Tuple:
+        # Matching is case-insensitive, so the lowercased text is the normalized form;
+        # the raw length keeps length heuristics exact. Only the hash is stored, not the text.
+        return (hash(task_l), task_len, hint, risk_level, rules_version)
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        with self._lock:
+            value = self._store.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._store.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple, value: Any) -> None:
+        with self._lock:
+            self._store[key] = value
+            self._store.move_to_end(key)
+            if len(self._store) > self.max_items:
+                self._store.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._store),
+                "max_items": self.max_items,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+class _Node:
+    __slots__ = ("children", "hits")
+
+    def __init__(self):
+        self.children = {}  # first char -> (edge label, child node)
+        self.hits: Optional[FrozenSet[str]] = None
+
+
+class TemplateIndex:
+    """
+    Radix trie of lowercased template prefixes -> phrases (from `phrases`) found in
+    that prefix. Edge labels are compared with str.startswith, so a lookup costs one
+    C-level compare per branch point rather than one Python step per character.
+    """
+
+    def __init__(self, templates: Iterable[str], phrases: Iterable[str]):
+        phrases = tuple(set(phrases))
+        # A phrase can straddle the prefix/suffix boundary by at most len-1 chars.
+        self.overlap = max((len(p) for p in phrases), default=1) - 1
+        self._root = _Node()
+        self.size = 0
+        for template in templates:
+            t = template.lower()
+            if t:
+                self._insert(t, frozenset(p for p in phrases if p in t))
+                self.size += 1
+
+    def _insert(self, key: str, hits: FrozenSet[str]) -> None:
+        node, pos = self._root, 0
+        while pos < len(key):
+            edge = node.children.get(key[pos])
+            if edge is None:
+                child = _Node()
+                node.children[key[pos]] = (key[pos:], child)
+                node = child
+                pos = len(key)
+                break
+            label, child = edge
+            common = 0
+            limit = min(len(label), len(key) - pos)
+            while common < limit and label[common] == key[pos + common]:
+                common += 1
+            if common < len(label):
+                # Split the edge at the first mismatch.
+                mid = _Node()
+                mid.children[label[common]] = (label[common:], child)
+                node.children[key[pos]] = (label[:common], mid)
+                child = mid
+            node, pos = child, pos + common
+        node.hits = hits
+
+    def lookup(self, task_l: str) -> Optional[Tuple[int, FrozenSet[str]]]:
+        """Longest known prefix of task_l as (prefix length, phrases in it), or None."""
+        node, pos, best = self._root, 0, None
+        n = len(task_l)
+        while True:
+            if node.hits is not None:
+                best = (pos, node.hits)
+            if pos >= n:
+                return best
+            edge = node.children.get(task_l[pos])
+            if edge is None or not task_l.startswith(edge[0], pos):
+                return best
+            pos += len(edge[0])
+            node = edge[1]
@@ -1,5 +1,23 @@
-from typing import Any, Dict, Tuple, List
+import sys
+from typing import Any, Dict, Tuple, List, Optional
 from .schemas import TaskType, RouteRequest, RouteDecision
+from .decision import (
+    Decision,
+    RULE_TASK_TYPE_DEFAULT,
+    RULE_KEYWORD_MATCH,
+    RULE_INTENT_MATCH,
+    HEURISTIC_LONG_TEXT,
+    HEURISTIC_LONG_TEXT_CHUNKED,
+    FALLBACK_DEFAULT,
+    MODEL_CLASSIFIER,
+    STEP_HARD_REASONING,
+    STEP_TASK_TYPE_KEYWORDS,
+    STEP_LONG_TEXT,
+    STEP_LONG_TEXT_CHUNKED,
+    STEP_RISK_HIGH,
+)
+from .tokens import TokenEstimator
+from .memo import DecisionMemo, TemplateIndex
 
 HARD_REASONING_KEYWORDS = [
     "compare", "trade-off", "recommend", "decide", "why", "pros and cons",
@@ -51,96 +69,270 @@ INTENT_VERBS = {
 }
 
 
-def _contains_any(text: str, keywords: List[str]) -> bool:
-    t = text.lower()
-    return any(k.lower() in t for k in keywords)
+class CompiledRules:
+    """
+    rules.yaml flattened into lowercased tuples, so the hot path does not
+    re-lowercase every keyword and re-walk nested dicts on each request.
+    Build it with compile_rules(); it is cached per rules dict.
+    """
+
+    __slots__ = (
+        "rules", "intent_verbs", "keyword_types", "hard_keywords", "task_types",
+        "default_tier", "long_text_threshold", "long_text_metric", "long_text_escalate_to", "chunk_task_types",
+        "model_names", "tokens", "classifier", "classifier_min_confidence", "version", "memo", "templates",
+    )
+
+    def __init__(self, rules: Dict[str, Any]):
+        self.rules = rules
+        # Match reasons are interned once here instead of formatted per request.
+        self.intent_verbs = tuple(
+            (task_type, tuple((p.lower(), sys.intern(f"intent:{p}")) for p in phrases))
+            for task_type, phrases in INTENT_VERBS.items()
+        )
+        task_types = rules.get("task_types", {}) or {}
+        self.keyword_types = tuple(
+            (tt_name, tuple((kw.lower(), sys.intern(f"keyword:{kw}")) for kw in (tt_cfg.get("keywords") or [])))
+            for tt_name, tt_cfg in task_types.items()
+        )
+        self.hard_keywords = tuple(k.lower() for k in HARD_REASONING_KEYWORDS)
+
+        self.default_tier = rules.get("default_model_tier", "cheap")
+        # task_type value -> (default_tier, escalate_if_keywords)
+        self.task_types = {
+            tt_name: (
+                tt_cfg.get("default_tier", self.default_tier),
+                tuple(k.lower() for k in (tt_cfg.get("escalate_if_keywords") or [])),
+            )
+            for tt_name, tt_cfg in task_types.items()
+        }
+
+        heur = rules.get("heuristics", {}) or {}
+        # Token threshold when configured; long_text_chars_threshold is the fallback.
+        if heur.get("long_text_tokens_threshold") is not None:
+            self.long_text_threshold = int(heur["long_text_tokens_threshold"])
+            self.long_text_metric = "long_text_tokens"
+        else:
+            self.long_text_threshold = int(heur.get("long_text_chars_threshold", 2500))
+            self.long_text_metric = "long_text_chars"
+        self.tokens = TokenEstimator(rules.get("token_estimation"))
+        self.long_text_escalate_to = heur.get("long_text_escalate_to", "strong")
+
+        chunking = rules.get("chunking", {}) or {}
+        self.chunk_task_types = frozenset(chunking.get("task_types") or []) if chunking.get("enabled") else frozenset()
+
+        clf_cfg = rules.get("classifier", {}) or {}
+        self.classifier = None
+        self.classifier_min_confidence = float(clf_cfg.get("min_confidence", 0.6))
+        if clf_cfg.get("enabled"):
+            from .classifier import TaskTypeClassifier
+            self.classifier = TaskTypeClassifier.load(clf_cfg.get("path", "models/task_classifier.npz"))
+
+        models = rules.get("models", {}) or {}
+        self.model_names = {tier: (cfg or {}).get("name", "UNKNOWN_MODEL") for tier, cfg in models.items()}
+
+        self.version = rules.get("version")
+        memo_cfg = rules.get("decision_memo", {}) or {}
+        self.memo = DecisionMemo(memo_cfg.get("max_items", 10000)) if memo_cfg.get("enabled") else None
+        self.templates = None
+        if memo_cfg.get("templates"):
+            phrases = [p for _, ps in self.intent_verbs for p, _ in ps]
+            phrases += [kw for _, kws in self.keyword_types for kw, _ in kws]
+            phrases += list(self.hard_keywords)
+            phrases += [k for _, esc in self.task_types.values() for k in esc]
+            self.templates = TemplateIndex(memo_cfg["templates"], phrases)
+
+
+_COMPILED: Dict[int, CompiledRules] = {}
+
+
+def compile_rules(rules: Dict[str, Any]) -> CompiledRules:
+    compiled = _COMPILED.get(id(rules))
+    if compiled is not None and compiled.rules is rules:
+        return compiled
+    compiled = CompiledRules(rules)
+    _COMPILED[id(rules)] = compiled
+    return compiled
+
+
+def invalidate_rules(rules: Optional[Dict[str, Any]] = None) -> None:
+    """Drop compiled state (and its decision memo / template index) for `rules`, or all of it."""
+    if rules is None:
+        _COMPILED.clear()
+    else:
+        _COMPILED.pop(id(rules), None)
 
-def _infer_from_intent_verbs(task: str) -> Tuple[TaskType | None, str | None]:
-    task_l = task.lower()
-    for task_type, phrases in INTENT_VERBS.items():
-        for phrase in phrases:
-            if phrase in task_l:
-                return task_type, f"intent:{phrase}"
-    return None, None
 
-def _infer_task_type(task: str, rules: Dict[str, Any]) -> Tuple[TaskType, str]:
+# Phrase matching below checks `phrase in hits or phrase in scan`: with a known
+# template prefix, `hits` holds the phrases precomputed for the prefix and `scan`
+# is only the boundary + suffix; otherwise hits is empty and scan is the full text.
+_NO_HITS: frozenset = frozenset()
+
+def _match_intent(scan: str, compiled: CompiledRules, hits: frozenset = _NO_HITS) -> Optional[Tuple[TaskType, str]]:
+    for task_type, phrases in compiled.intent_verbs:
+        for phrase, reason in phrases:
+            if phrase in hits or phrase in scan:
+                return task_type, reason
+    return None
+
+def _match_keyword(scan: str, compiled: CompiledRules, hits: frozenset = _NO_HITS) -> Optional[Tuple[TaskType, str]]:
+    for tt_name, keywords in compiled.keyword_types:
+        for kw_l, reason in keywords:
+            if kw_l in hits or kw_l in scan:
+                return TaskType(tt_name), reason
+    return None
+
+def _infer_task_type_compiled(
+    task_l: str,
+    compiled: CompiledRules,
+    hits: frozenset = _NO_HITS,
+    scan: Optional[str] = None,
+) -> Tuple[TaskType, str]:
+    scan = task_l if scan is None else scan
     # 1) Intent verbs (NEW)
-    intent_task, intent_reason = _infer_from_intent_verbs(task)
-    if intent_task is not None:
-        return intent_task, intent_reason
-
-    # 2) Keyword-based inference (existing behavior)
-    task_l = task.lower()
-    task_types = rules.get("task_types", {})
-    for tt_name, tt_cfg in task_types.items():
-        for kw in tt_cfg.get("keywords", []):
-            if kw.lower() in task_l:
-                return TaskType(tt_name), f"keyword:{kw}"
-
-    # 3) Fallback
+    intent = _match_intent(scan, compiled, hits)
+    if compiled.classifier is None:
+        if intent is not None:
+            return intent
+
+        # 2) Keyword-based inference (existing behavior)
+        keyword = _match_keyword(scan, compiled, hits)
+        if keyword is not None:
+            return keyword
+
+        # 3) Fallback
+        return TaskType.summarization, "no_intent_or_keyword_match"
+
+    # Optional learned stage: only consulted when the rules abstain or disagree.
+    keyword = _match_keyword(scan, compiled, hits)
+    if intent is not None and (keyword is None or keyword[0] == intent[0]):
+        return intent
+    if intent is None and keyword is not None:
+        return keyword
+
+    tt_name, confidence = compiled.classifier.predict_one(task_l)
+    if confidence >= compiled.classifier_min_confidence:
+        return TaskType(tt_name), f"model:{tt_name}:{confidence:.2f}"
+    if intent is not None:
+        return intent
     return TaskType.summarization, "no_intent_or_keyword_match"
 
 
 
 def decide_route(req: RouteRequest, rules: Dict[str, Any]) -> RouteDecision:
-    reason_codes: List[str] = []
-    task_text = req.task
+    return decide_fast(req.task, req.task_type_hint, req.constraints.risk_level, rules).to_schema()
+
+
+def decide_fast(
+    task_text: str,
+    task_type_hint: Optional[TaskType],
+    risk_level: str,
+    rules: Dict[str, Any],
+) -> Decision:
+    """
+    Routing logic behind decide_route(). Takes the raw request fields and returns
+    the internal Decision, so the hot path (and offline tools like eval/replay.py)
+    skip pydantic entirely until the API boundary. With `decision_memo` enabled,
+    repeated (task, hint, risk) inputs return the memoized Decision.
+    """
+    compiled = compile_rules(rules)
+    task_l = task_text.lower()
+    memo = compiled.memo
+    if memo is None:
+        return _decide_compiled(task_text, task_l, task_type_hint, risk_level, compiled)
+
+    key = memo.make_key(task_l, len(task_text), task_type_hint, risk_level, compiled.version)
+    decision = memo.get(key)
+    if decision is None:
+        decision = _decide_compiled(task_text, task_l, task_type_hint, risk_level, compiled)
+        memo.put(key, decision)
+    return decision
+
+
+def _decide_compiled(
+    task_text: str,
+    task_l: str,
+    task_type_hint: Optional[TaskType],
+    risk_level: str,
+    compiled: CompiledRules,
+) -> Decision:
+    codes: List[int] = []
+    steps: List[int] = []
+
+    hits, scan = _NO_HITS, task_l
+    if compiled.templates is not None:
+        prefix = compiled.templates.lookup(task_l)
+        if prefix is not None:
+            cut, hits = prefix
+            scan = task_l[max(0, cut - compiled.templates.overlap):]
 
     # 1) Task type
-    if req.task_type_hint is not None:
-        task_type = req.task_type_hint
-        reason_codes.append("RULE_TASK_TYPE_DEFAULT")
-        routing_reason = f"Used task_type_hint={task_type.value}"
+    if task_type_hint is not None:
+        task_type = TaskType(task_type_hint)
+        codes.append(RULE_TASK_TYPE_DEFAULT)
+        match_reason = None
     else:
-        task_type, match_reason = _infer_task_type(task_text, rules)
+        task_type, match_reason = _infer_task_type_compiled(task_l, compiled, hits, scan)
         if match_reason.startswith("intent:"):
-            reason_codes.append("RULE_INTENT_MATCH")
+            codes.append(RULE_INTENT_MATCH)
         elif match_reason.startswith("keyword:"):
-            reason_codes.append("RULE_KEYWORD_MATCH")
+            codes.append(RULE_KEYWORD_MATCH)
+        elif match_reason.startswith("model:"):
+            codes.append(MODEL_CLASSIFIER)
         else:
-            reason_codes.append("FALLBACK_DEFAULT")
-
-        routing_reason = f"Inferred task_type={task_type.value} ({match_reason})"
+            codes.append(FALLBACK_DEFAULT)
 
     # 2) Default tier by task type
-    tt_cfg = rules.get("task_types", {}).get(task_type.value, {})
-    chosen_tier = tt_cfg.get("default_tier", rules.get("default_model_tier", "cheap"))
+    chosen_tier, esc_keywords = compiled.task_types.get(task_type.value, (compiled.default_tier, ()))
 
     # 3) Escalate if "hard reasoning" keywords are present (generic)
-    if _contains_any(task_text, HARD_REASONING_KEYWORDS) and chosen_tier != "strong":
+    if chosen_tier != "strong" and any(k in hits or k in scan for k in compiled.hard_keywords):
         chosen_tier = "strong"
-        reason_codes.append("RULE_KEYWORD_MATCH")
-        routing_reason += " | Escalated due to HARD_REASONING_KEYWORDS"
+        codes.append(RULE_KEYWORD_MATCH)
+        steps.append(STEP_HARD_REASONING)
 
     # 4) Escalate if task-type-specific escalation keywords match
-    esc_keywords = tt_cfg.get("escalate_if_keywords", [])
-    if esc_keywords and _contains_any(task_text, esc_keywords) and chosen_tier != "strong":
+    if esc_keywords and chosen_tier != "strong" and any(k in hits or k in scan for k in esc_keywords):
         chosen_tier = "strong"
-        reason_codes.append("RULE_KEYWORD_MATCH")
-        routing_reason += f" | Escalated due to task_type escalation keywords"
+        codes.append(RULE_KEYWORD_MATCH)
+        steps.append(STEP_TASK_TYPE_KEYWORDS)
 
-    # 5) Long text heuristic
-    heur = rules.get("heuristics", {})
-    threshold = int(heur.get("long_text_chars_threshold", 2500))
-    if len(task_text) >= threshold and chosen_tier != "strong":
-        chosen_tier = heur.get("long_text_escalate_to", "strong")
-        reason_codes.append("HEURISTIC_LONG_TEXT")
-        routing_reason += f" | Escalated due to long_text_chars>={threshold}"
+    # 5) Long text heuristic (chunkable task types stay cheap and run map-reduce,
+    #    unless risk_level=high, which keeps the single strong call)
+    threshold = compiled.long_text_threshold
+    if compiled.long_text_metric == "long_text_tokens":
+        text_len = compiled.tokens.estimate(task_text, compiled.model_names.get(chosen_tier))
+    else:
+        text_len = len(task_text)
+    if text_len >= threshold and chosen_tier != "strong":
+        if task_type.value in compiled.chunk_task_types and risk_level != "high":
+            codes.append(HEURISTIC_LONG_TEXT_CHUNKED)
+            steps.append(STEP_LONG_TEXT_CHUNKED)
+        else:
+            chosen_tier = compiled.long_text_escalate_to
+            codes.append(HEURISTIC_LONG_TEXT)
+            steps.append(STEP_LONG_TEXT)
 
     # 6) Risk-level escalation (simple v1)
-    if req.constraints.risk_level in ("high",) and chosen_tier != "strong":
+    if risk_level in ("high",) and chosen_tier != "strong":
         chosen_tier = "strong"
-        reason_codes.append("RULE_TASK_TYPE_DEFAULT")
-        routing_reason += " | Escalated due to risk_level=high"
+        codes.append(RULE_TASK_TYPE_DEFAULT)
+        steps.append(STEP_RISK_HIGH)
 
     # 7) Map tier -> model name
-    models = rules.get("models", {})
-    chosen_model_name = models.get(chosen_tier, {}).get("name", "UNKNOWN_MODEL")
+    chosen_model_name = compiled.model_names.get(chosen_tier, "UNKNOWN_MODEL")
+
+    flags = 0
+    for c in codes:
+        flags |= c
 
-    return RouteDecision(
+    return Decision(
         chosen_tier=chosen_tier,
         chosen_model_name=chosen_model_name,
         task_type=task_type,
-        reason_codes=reason_codes,
-        routing_reason=routing_reason,
+        codes=tuple(codes),
+        flags=flags,
+        match_reason=match_reason,
+        steps=tuple(steps),
+        long_text_threshold=threshold,
+        long_text_metric=compiled.long_text_metric,
     )
@@ -23,6 +23,8 @@ class OutputSpec(BaseModel):
     output_format: Literal["text", "json"] = "text"
     required_json_keys: List[str] = Field(default_factory=list)
     max_words: Optional[int] = None  # helpful for summaries
+    json_schema: Optional[Dict[str, Any]] = None  # full JSON Schema, validated and used as the format constraint
+    constrained: Optional[bool] = None  # JSON-constrained decoding; None = rules.yaml structured_output.constrain
 
 
 class RouteConstraints(BaseModel):
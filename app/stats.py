@@ -0,0 +1,222 @@
+"""
+In-process rolling aggregation of audit records for live dashboards (/stats).
+
+Each window is a ring of fixed-duration buckets; a bucket holds counters and one
+latency sketch per task type. Memory is bounded by the number of buckets, the
+(small, fixed) set of counter keys and the sketch bin range, not by traffic.
+"""
+import math
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+# name -> (bucket_seconds, n_buckets)
+WINDOWS = {
+    "1m": (5, 12),
+    "5m": (30, 10),
+    "1h": (300, 12),
+}
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class QuantileSketch:
+    """
+    Log-bucketed histogram with ~1% relative error (DDSketch-style). Two sketches
+    merge by adding bin counts, so buckets combine into any window exactly.
+    """
+
+    ALPHA = 0.01
+    GAMMA = (1 + ALPHA) / (1 - ALPHA)
+    _LOG_GAMMA = math.log(GAMMA)
+    MAX_BIN = int(math.ceil(math.log(1e7) / _LOG_GAMMA))  # ~2.8 h in ms
+
+    __slots__ = ("bins", "count", "zeros", "max")
+
+    def __init__(self):
+        self.bins: Dict[int, int] = {}
+        self.count = 0
+        self.zeros = 0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value <= 0:
+            self.zeros += 1
+            return
+        self.max = max(self.max, value)
+        k = min(self.MAX_BIN, int(math.ceil(math.log(value) / self._LOG_GAMMA)))
+        self.bins[k] = self.bins.get(k, 0) + 1
+
+    def merge(self, other: "QuantileSketch") -> None:
+        self.count += other.count
+        self.zeros += other.zeros
+        self.max = max(self.max, other.max)
+        for k, n in other.bins.items():
+            self.bins[k] = self.bins.get(k, 0) + n
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for k in sorted(self.bins):
+            seen += self.bins[k]
+            if rank < seen:
+                return min(self.max, 2 * self.GAMMA ** k / (self.GAMMA + 1))
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"count": self.count}
+        for q in QUANTILES:
+            v = self.quantile(q)
+            out[f"p{int(q * 100)}"] = round(v, 1) if v is not None else None
+        out["max"] = round(self.max, 1)
+        return out
+
+
+class _Bucket:
+    __slots__ = ("counters", "latency")
+
+    def __init__(self):
+        self.counters: Counter = Counter()
+        self.latency: Dict[str, QuantileSketch] = {}
+
+
+def _reason_key(reason: Optional[str]) -> str:
+    # "too_long:120>80" / "missing_keys:['a']" -> bounded set of keys
+    return (reason or "none").split(":", 1)[0]
+
+
+class RollingStats:
+    def __init__(self, windows: Dict[str, tuple] = WINDOWS):
+        self._lock = threading.Lock()
+        self._windows = {
+            name: (bucket_s, [None] * n, [-1] * n)
+            for name, (bucket_s, n) in windows.items()
+        }
+
+    @staticmethod
+    def _observe(bucket: _Bucket, record: Dict[str, Any]) -> None:
+        c = bucket.counters
+        mode = record.get("mode") or "unknown"
+        c["requests"] += 1
+        c[f"mode:{mode}"] += 1
+
+        decision = record.get("decision") or {}
+        task_type = decision.get("task_type") or "unknown"
+        if decision:
+            c[f"tier:{decision.get('chosen_tier')}"] += 1
+            c[f"task_type:{task_type}"] += 1
+
+        if mode == "execute":
+            c["executed"] += 1
+            c["cache_hit" if record.get("cache_hit_first") else "cache_miss"] += 1
+            if record.get("escalated"):
+                c["escalated"] += 1
+                c[f"escalation:{_reason_key(record.get('escalation_reason'))}"] += 1
+        elif mode == "rejected":
+            c[f"rejected:{_reason_key(record.get('reject_reason'))}"] += 1
+        elif mode == "cancelled":
+            c[f"cancelled:{record.get('cancel_reason')}"] += 1
+
+        latency = record.get("latency_ms_total")
+        if mode == "execute" and isinstance(latency, (int, float)):
+            for key in (task_type, "_all"):
+                sketch = bucket.latency.get(key)
+                if sketch is None:
+                    sketch = bucket.latency[key] = QuantileSketch()
+                sketch.add(latency)
+
+    def record(self, record: Dict[str, Any], now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            for bucket_s, buckets, epochs in self._windows.values():
+                idx = int(now // bucket_s)
+                slot = idx % len(buckets)
+                if epochs[slot] != idx:
+                    buckets[slot] = _Bucket()
+                    epochs[slot] = idx
+                self._observe(buckets[slot], record)
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.time() if now is None else now
+        out: Dict[str, Any] = {"generated_at": now, "windows": {}}
+        with self._lock:
+            for name, (bucket_s, buckets, epochs) in self._windows.items():
+                current = int(now // bucket_s)
+                counters: Counter = Counter()
+                latency: Dict[str, QuantileSketch] = {}
+                for bucket, epoch in zip(buckets, epochs):
+                    if bucket is None or epoch <= current - len(buckets):
+                        continue
+                    counters.update(bucket.counters)
+                    for key, sketch in bucket.latency.items():
+                        latency.setdefault(key, QuantileSketch()).merge(sketch)
+                out["windows"][name] = _summarize(counters, latency, bucket_s * len(buckets))
+        return out
+
+
+def _summarize(c: Counter, latency: Dict[str, QuantileSketch], span_s: int) -> Dict[str, Any]:
+    def group(prefix: str) -> Dict[str, int]:
+        return {k[len(prefix):]: v for k, v in c.items() if k.startswith(prefix)}
+
+    executed = c["executed"]
+    lookups = c["cache_hit"] + c["cache_miss"]
+    return {
+        "span_s": span_s,
+        "requests": c["requests"],
+        "by_mode": group("mode:"),
+        "tier_mix": group("tier:"),
+        "task_type_mix": group("task_type:"),
+        "escalation_rate": round(c["escalated"] / executed, 4) if executed else None,
+        "escalation_reasons": group("escalation:"),
+        "cache_hit_rate": round(c["cache_hit"] / lookups, 4) if lookups else None,
+        "rejected": group("rejected:"),
+        "cancelled": group("cancelled:"),
+        "latency_ms": {k: s.to_dict() for k, s in sorted(latency.items())},
+    }
+
+
+class StructuredOutputStats:
+    """
+    Per-model outcomes of JSON validations (cheap_first_verify): how often the
+    first answer was valid with and without format-constrained decoding, and
+    how often the local repair turned an invalid answer into a valid one.
+    """
+
+    _FIELDS = ("constrained", "constrained_valid", "unconstrained", "unconstrained_valid",
+               "repair_attempts", "repaired")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, Counter] = {}
+
+    def record(self, model: str, constrained: bool, valid: bool, repair_attempted: bool, repaired: bool) -> None:
+        with self._lock:
+            c = self._models.setdefault(model, Counter())
+            prefix = "constrained" if constrained else "unconstrained"
+            c[prefix] += 1
+            if valid:
+                c[f"{prefix}_valid"] += 1
+            if repair_attempted:
+                c["repair_attempts"] += 1
+                if repaired:
+                    c["repaired"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        def rate(n: int, d: int) -> Optional[float]:
+            return round(n / d, 4) if d else None
+
+        with self._lock:
+            out = {}
+            for model, c in self._models.items():
+                row = {f: c[f] for f in self._FIELDS}
+                row["constrained_valid_rate"] = rate(c["constrained_valid"], c["constrained"])
+                row["unconstrained_valid_rate"] = rate(c["unconstrained_valid"], c["unconstrained"])
+                row["repair_success_rate"] = rate(c["repaired"], c["repair_attempts"])
+                out[model] = row
+            return out
@@ -0,0 +1,303 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .cancellation import CancelToken, GenerationCancelled
+
+
+class QueueTimeout(Exception):
+    pass
+
+
+class TenantState:
+    """Token bucket + counters for one tenant. One object per tenant keeps lookups O(1)."""
+
+    __slots__ = (
+        "rate", "burst", "weight", "tokens", "updated",
+        "allowed", "rejected", "queued", "queue_timeouts", "wait_ms_total", "wait_ms_max",
+    )
+
+    def __init__(self, rate: float, burst: float, weight: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.weight = weight
+        self.tokens = burst
+        self.updated = now
+        self.allowed = 0
+        self.rejected = 0
+        self.queued = 0
+        self.queue_timeouts = 0
+        self.wait_ms_total = 0
+        self.wait_ms_max = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rate_per_s": self.rate,
+            "burst": self.burst,
+            "weight": self.weight,
+            "tokens": round(self.tokens, 2),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "queued": self.queued,
+            "queue_timeouts": self.queue_timeouts,
+            "avg_queue_wait_ms": round(self.wait_ms_total / self.queued, 1) if self.queued else 0.0,
+            "max_queue_wait_ms": self.wait_ms_max,
+        }
+
+
+class TenantLimiter:
+    """
+    Per-tenant token-bucket rate limits, configured by the `tenancy` section of rules.yaml.
+    Tenants are kept in an LRU bounded by max_tracked_tenants.
+    """
+
+    def __init__(self, cfg: Dict[str, Any]):
+        cfg = cfg or {}
+        self.enabled = bool(cfg.get("enabled", False))
+        self.key = cfg.get("key", "tenant_id")
+        self.default_tenant = str(cfg.get("default_tenant", "anonymous"))
+        self.max_tenants = int(cfg.get("max_tracked_tenants", 50000))
+        default = cfg.get("default") or {}
+        self._default = (
+            float(default.get("rate_per_s", 10.0)),
+            float(default.get("burst", 50)),
+            float(default.get("weight", 1.0)),
+        )
+        self._overrides = {
+            str(name): (
+                float(t.get("rate_per_s", self._default[0])),
+                float(t.get("burst", self._default[1])),
+                float(t.get("weight", self._default[2])),
+            )
+            for name, t in (cfg.get("tenants") or {}).items()
+        }
+        self._states: "OrderedDict[str, TenantState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def tenant_of(self, metadata: Dict[str, Any]) -> str:
+        value = (metadata or {}).get(self.key)
+        return str(value) if value not in (None, "") else self.default_tenant
+
+    def _state(self, tenant: str, now: float) -> TenantState:
+        # Caller holds the lock.
+        st = self._states.get(tenant)
+        if st is None:
+            rate, burst, weight = self._overrides.get(tenant, self._default)
+            st = TenantState(rate, burst, weight, now)
+            self._states[tenant] = st
+            if len(self._states) > self.max_tenants:
+                self._states.popitem(last=False)
+        else:
+            self._states.move_to_end(tenant)
+        return st
+
+    def weight(self, tenant: str) -> float:
+        return self._overrides.get(tenant, self._default)[2]
+
+    def try_acquire(self, tenant: str) -> Tuple[bool, float]:
+        """
+        Returns (allowed, retry_after_s).
+        """
+        now = time.monotonic()
+        with self._lock:
+            st = self._state(tenant, now)
+            st.tokens = min(st.burst, st.tokens + (now - st.updated) * st.rate)
+            st.updated = now
+            if st.tokens >= 1.0:
+                st.tokens -= 1.0
+                st.allowed += 1
+                return True, 0.0
+            st.rejected += 1
+            retry_after = (1.0 - st.tokens) / st.rate if st.rate > 0 else 60.0
+            return False, retry_after
+
+    def record_queue(self, tenant: str, wait_ms: int, timed_out: bool = False) -> None:
+        with self._lock:
+            st = self._state(tenant, time.monotonic())
+            st.queued += 1
+            st.wait_ms_total += wait_ms
+            st.wait_ms_max = max(st.wait_ms_max, wait_ms)
+            if timed_out:
+                st.queue_timeouts += 1
+
+    def stats(self, tenant: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            st = self._states.get(tenant)
+            return st.to_dict() if st is not None else None
+
+    def top(self, limit: int = 50, by: str = "rejected") -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = [{"tenant": name, **st.to_dict()} for name, st in self._states.items()]
+        rows.sort(key=lambda r: r.get(by, 0), reverse=True)
+        return rows[:limit]
+
+
+class _Waiter:
+    """A queued request: a threading.Event for sync callers, an asyncio future for async ones."""
+
+    __slots__ = ("event", "granted", "loop", "future")
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.granted = False
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future = loop.create_future() if loop is not None else None
+
+    def grant(self) -> None:
+        # Caller holds the queue lock; may run on any thread.
+        self.granted = True
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: "asyncio.Future") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class FairQueue:
+    """
+    Weighted fair queuing in front of execution, using deficit round robin:
+    each backlogged tenant gets `weight` execution slots per round, so one noisy
+    tenant cannot starve the others. Enqueue and dispatch are O(1) per request.
+    """
+
+    def __init__(self, max_concurrent: int, max_wait_s: float):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_wait_s = max_wait_s
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiting = 0
+        self._queues: Dict[str, Deque[_Waiter]] = {}
+        self._weights: Dict[str, float] = {}
+        self._deficit: Dict[str, float] = {}
+        self._active: Deque[str] = deque()
+
+    def _enqueue(self, tenant: str, weight: float, waiter: _Waiter) -> bool:
+        """Takes a free slot (True) or queues `waiter` (False)."""
+        with self._lock:
+            if self._in_flight < self.max_concurrent and self._waiting == 0:
+                self._in_flight += 1
+                return True
+            q = self._queues.get(tenant)
+            if q is None:
+                q = self._queues[tenant] = deque()
+                self._weights[tenant] = max(weight, 0.01)
+                self._deficit[tenant] = 0.0
+                self._active.append(tenant)
+            q.append(waiter)
+            self._waiting += 1
+            self._dispatch()
+            return False
+
+    def _leave(self, tenant: str, waiter: _Waiter, cancel: Optional[CancelToken]) -> None:
+        """After the wait: raises unless the slot was granted."""
+        with self._lock:
+            if waiter.granted:
+                return
+            # Leave the tenant in the round-robin ring; _dispatch drops empty queues lazily.
+            self._queues[tenant].remove(waiter)
+            self._waiting -= 1
+        if cancel is not None and cancel.is_cancelled():
+            raise GenerationCancelled(cancel.reason)
+        raise QueueTimeout(f"queue_wait_exceeded:{int(self.max_wait_s * 1000)}ms")
+
+    def acquire(self, tenant: str, weight: float = 1.0, cancel: Optional[CancelToken] = None) -> int:
+        """
+        Blocks until an execution slot is granted; returns the queue wait in ms.
+        Raises QueueTimeout after max_wait_s, or GenerationCancelled if `cancel`
+        fires first (the request leaves the queue without using a slot).
+        """
+        t0 = time.perf_counter()
+        waiter = _Waiter()
+        if self._enqueue(tenant, weight, waiter):
+            return 0
+
+        give_up_at = time.monotonic() + self.max_wait_s
+        while True:
+            remaining = give_up_at - time.monotonic()
+            if remaining <= 0:
+                break
+            if waiter.event.wait(remaining if cancel is None else min(remaining, 0.25)):
+                break
+            if cancel is not None and cancel.is_cancelled():
+                break
+        self._leave(tenant, waiter, cancel)
+        return int((time.perf_counter() - t0) * 1000)
+
+    async def acquire_async(self, tenant: str, weight: float = 1.0, cancel: Optional[CancelToken] = None) -> int:
+        """
+        acquire() for the event loop: the wait holds no thread, so queued requests
+        cannot exhaust the threadpool that runs the admitted ones.
+        """
+        t0 = time.perf_counter()
+        waiter = _Waiter(asyncio.get_running_loop())
+        if self._enqueue(tenant, weight, waiter):
+            return 0
+
+        give_up_at = time.monotonic() + self.max_wait_s
+        try:
+            while True:
+                remaining = give_up_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, _ = await asyncio.wait({waiter.future}, timeout=remaining if cancel is None else min(remaining, 0.25))
+                if done or (cancel is not None and cancel.is_cancelled()):
+                    break
+        except asyncio.CancelledError:
+            # The task went away: give back a slot granted meanwhile, or leave the queue.
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._queues[tenant].remove(waiter)
+                    self._waiting -= 1
+            if granted:
+                self.release()
+            raise
+        self._leave(tenant, waiter, cancel)
+        return int((time.perf_counter() - t0) * 1000)
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        # Caller holds the lock.
+        while self._in_flight < self.max_concurrent and self._active:
+            tenant = self._active[0]
+            q = self._queues[tenant]
+            if not q:
+                self._active.popleft()
+                del self._queues[tenant], self._weights[tenant], self._deficit[tenant]
+                continue
+            if self._deficit[tenant] < 1.0:
+                self._deficit[tenant] += self._weights[tenant]
+                if self._deficit[tenant] < 1.0:
+                    self._active.rotate(-1)
+                    continue
+
+            waiter = q.popleft()
+            self._deficit[tenant] -= 1.0
+            self._waiting -= 1
+            self._in_flight += 1
+            waiter.grant()
+
+            if not q:
+                self._active.popleft()
+                del self._queues[tenant], self._weights[tenant], self._deficit[tenant]
+            elif self._deficit[tenant] < 1.0:
+                self._active.rotate(-1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "backlogged_tenants": len(self._active),
+            }
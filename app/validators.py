@@ -1,6 +1,8 @@
+import hashlib
 import json
 import re
-from typing import Tuple, Optional, List
+from functools import lru_cache
+from typing import Any, Dict, Tuple, Optional, List, Union
 from jsonschema import Draft7Validator
 
 UNCERTAINTY_PATTERNS = [
@@ -37,7 +39,139 @@ def validate_required_keys(obj: dict, required_keys: List[str]) -> Tuple[bool, s
         return False, f"missing_keys:{missing}"
     return True, "ok"
 
-def validate_output(answer: str, output_format: str, required_json_keys: List[str], max_words: Optional[int]) -> Tuple[bool, str]:
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+_BARE_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_\-]*")
+_KEY_COLON = re.compile(r"\s*:")
+_CLOSER_AHEAD = re.compile(r"\s*[}\]]")
+_SINGLE_QUOTED_ESCAPE = re.compile(r'\\(.)|"', re.DOTALL)
+_PY_TO_JSON = {"True": "true", "False": "false", "None": "null"}
+
+
+def _single_to_double(body: str) -> str:
+    """Body of a '...' string as the body of a "..." string: \\' -> ', " -> \\"."""
+    def sub(m):
+        if m.group(1) is None:
+            return '\\"'
+        return "'" if m.group(1) == "'" else m.group(0)
+    return _SINGLE_QUOTED_ESCAPE.sub(sub, body)
+
+
+def _to_json_text(text: str) -> str:
+    """
+    Rewrites JS/Python-style object text as JSON, outside string literals only:
+    single-quoted strings, unquoted keys, True/False/None and trailing commas.
+    String contents are carried over unchanged; an unterminated string stays open.
+    """
+    out = []
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        if ch == '"' or ch == "'":
+            j = i + 1
+            while j < n and text[j] != ch:
+                j += 2 if text[j] == "\\" else 1
+            body = text[i + 1:min(j, n)]
+            out.append('"' + (_single_to_double(body) if ch == "'" else body) + ('"' if j < n else ""))
+            i = j + 1
+        elif ch.isalpha() or ch == "_":
+            word = _BARE_WORD.match(text, i).group(0)
+            i += len(word)
+            out.append('"' + word + '"' if _KEY_COLON.match(text, i) else _PY_TO_JSON.get(word, word))
+        elif ch == "," and _CLOSER_AHEAD.match(text, i + 1):
+            i += 1
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+def _close_brackets(text: str) -> str:
+    """Appends the closers a truncated object/array is missing (ignores brackets inside strings)."""
+    stack = []
+    in_str = escaped = False
+    for ch in text:
+        if in_str:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+    if in_str:
+        text += '"'
+    return text + "".join(reversed(stack))
+
+
+def repair_json(text: str) -> Optional[dict]:
+    """
+    Tolerant parse of near-valid JSON objects from small models: code fences,
+    trailing commas, single quotes, unquoted keys, Python literals and
+    truncated output. Only text outside string literals is rewritten, so string
+    values come back verbatim. Returns the object, or None if it still does not parse.
+    """
+    fenced = _FENCE.search(text)
+    candidate = fenced.group(1) if fenced else text
+    start = candidate.find("{")
+    if start == -1:
+        return None
+    candidate = candidate[start:]
+    end = candidate.rfind("}")
+    attempts = [candidate[:end + 1], _to_json_text(candidate[:end + 1])] if end != -1 else []
+    attempts.append(_close_brackets(_to_json_text(candidate).rstrip().rstrip(",")))
+
+    for variant in attempts:
+        try:
+            obj = json.loads(variant)
+        except ValueError:
+            continue
+        if isinstance(obj, dict):
+            return obj
+    return None
+
+
+def format_constraint(required_json_keys: List[str], json_schema: Optional[Dict[str, Any]] = None) -> Union[str, Dict[str, Any]]:
+    """
+    Value for Ollama's `format` parameter: the full JSON Schema when given, an
+    object schema requiring `required_json_keys`, or plain "json".
+    """
+    if json_schema:
+        return json_schema
+    if required_json_keys:
+        return {
+            "type": "object",
+            "properties": {k: {} for k in required_json_keys},
+            "required": list(required_json_keys),
+        }
+    return "json"
+
+
+@lru_cache(maxsize=256)
+def _schema_validator(schema_json: str) -> Draft7Validator:
+    return Draft7Validator(json.loads(schema_json))
+
+
+def validate_json_schema(obj: Any, json_schema: Dict[str, Any]) -> Tuple[bool, str]:
+    validator = _schema_validator(json.dumps(json_schema, sort_keys=True))
+    error = next(iter(validator.iter_errors(obj)), None)
+    if error is not None:
+        path = "/".join(str(p) for p in error.absolute_path) or "$"
+        return False, f"schema_violation:{path}"
+    return True, "ok"
+
+
+def validate_output(
+    answer: str,
+    output_format: str,
+    required_json_keys: List[str],
+    max_words: Optional[int],
+    json_schema: Optional[Dict[str, Any]] = None,
+) -> Tuple[bool, str]:
     """
     Returns (pass, reason).
     """
@@ -60,5 +194,26 @@ def validate_output(answer: str, output_format: str, required_json_keys: List[st
         ok, reason = validate_required_keys(obj, required_json_keys)
         if not ok:
             return False, reason
+        if json_schema:
+            ok, reason = validate_json_schema(obj, json_schema)
+            if not ok:
+                return False, reason
 
     return True, "ok"
+
+
+def spec_fingerprint(
+    output_format: str,
+    required_json_keys: List[str],
+    max_words: Optional[int],
+    json_schema: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Stable id of the validation spec, so a cached validation outcome is only
+    reused for the exact same output_spec.
+    """
+    spec = [output_format, sorted(required_json_keys), max_words]
+    if json_schema:
+        spec.append(json_schema)
+    raw = json.dumps(spec, separators=(",", ":"), sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,156 @@
+"""
+Cache warming from historical traffic (rules.yaml `cache_warming`).
+
+After a restart the response cache is empty. CacheWarmer mines the audit log for
+the most frequent executed requests and re-runs them, most frequent first, in a
+background thread: rate-limited, and (via the `run` callable from main) as a
+low-weight tenant of the fair queue, so live traffic is served first. The pod
+reports ready once warming finishes, or after max_duration_s at the latest.
+
+Only records that carry the task text can be re-run, i.e. logs written with
+audit.log_task_text: true.
+"""
+import json
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .auditlog import read_last_records
+
+
+def mine_requests(
+    path: str, max_requests: int, min_count: int = 1, lookback_records: int = 50000
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Most frequent executed requests among the last `lookback_records` audit records,
+    as RouteRequest payloads (most frequent first, with their `count`), plus the
+    number of records skipped per reason.
+    """
+    counts: Counter = Counter()
+    payloads: Dict[str, Dict[str, Any]] = {}
+    skipped: Counter = Counter()
+    for rec in read_last_records(path, max(1, lookback_records)):
+        if rec.get("mode") != "execute":
+            continue
+        if not rec.get("task"):
+            skipped["no_task_text"] += 1
+            continue
+        payload = {
+            "task": rec["task"],
+            "task_type_hint": rec.get("task_type_hint"),
+            "constraints": {"risk_level": rec.get("risk_level") or "low"},
+            "execution_mode": rec.get("execution_mode") or "direct",
+            "output_spec": rec.get("output_spec") or {},
+        }
+        # Same prompt + options -> same cache keys for every model _execute calls.
+        key = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        counts[key] += 1
+        payloads.setdefault(key, payload)
+
+    top = []
+    for key, n in counts.most_common():
+        if n < min_count or len(top) >= max_requests:
+            break
+        top.append({**payloads[key], "count": n})
+    skipped["below_min_count"] = sum(1 for n in counts.values() if n < min_count)
+    return top, dict(skipped)
+
+
+class CacheWarmer:
+    def __init__(self, cfg: Optional[Dict[str, Any]] = None):
+        cfg = cfg or {}
+        self.enabled = bool(cfg.get("enabled", False))
+        self.max_requests = int(cfg.get("max_requests", 200))
+        self.min_count = int(cfg.get("min_count", 2))
+        self.lookback_records = int(cfg.get("lookback_records", 50000))
+        self.rate_per_s = float(cfg.get("rate_per_s", 1.0))
+        self.max_duration_s = float(cfg.get("max_duration_s", 600))
+        self.tenant = str(cfg.get("tenant", "cache-warmer"))
+        self.weight = float(cfg.get("weight", 0.1))
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.state = "disabled" if not self.enabled else "pending"
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.total = 0
+        self.completed = 0
+        self.model_calls = 0
+        self.failed = 0
+        self.skipped: Dict[str, int] = {}
+
+    def start(self, log_path: str, run: Callable[[Dict[str, Any]], bool]) -> None:
+        """
+        Warms in a daemon thread. `run(payload)` executes one mined request and
+        returns True if it had to call a model (False: already cached).
+        """
+        if not self.enabled or self._thread is not None:
+            return
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, args=(log_path, run), name="cache-warmer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self, log_path: str, run: Callable[[Dict[str, Any]], bool]) -> None:
+        self.state = "mining"
+        try:
+            requests, self.skipped = mine_requests(log_path, self.max_requests, self.min_count, self.lookback_records)
+        except FileNotFoundError:
+            requests = []
+        except Exception as e:
+            self._finish("failed", f"mining_failed: {e}")
+            return
+        self.total = len(requests)
+        self.state = "warming"
+
+        interval = 1.0 / self.rate_per_s if self.rate_per_s > 0 else 0.0
+        next_at = time.monotonic()
+        for payload in requests:
+            delay = next_at - time.monotonic()
+            if (delay > 0 and self._stop.wait(delay)) or self._stop.is_set():
+                self._finish("stopped")
+                return
+            next_at = max(next_at, time.monotonic()) + interval
+            try:
+                called = run({k: v for k, v in payload.items() if k != "count"})
+            except Exception:
+                # One bad request (model error, queue timeout) must not stop warming.
+                with self._lock:
+                    self.failed += 1
+                continue
+            with self._lock:
+                self.completed += 1
+                self.model_calls += int(bool(called))
+        self._finish("done")
+
+    def _finish(self, state: str, error: Optional[str] = None) -> None:
+        self.state, self.error = state, error
+        self.finished_at = time.monotonic()
+
+    @property
+    def ready(self) -> bool:
+        """Ready once warming is over, or disabled, or max_duration_s after start."""
+        if self.state not in ("pending", "mining", "warming"):
+            return True
+        return self.started_at is not None and time.monotonic() - self.started_at >= self.max_duration_s
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            end = self.finished_at if self.finished_at is not None else time.monotonic()
+            return {
+                "state": self.state,
+                "ready": self.ready,
+                "total": self.total,
+                "completed": self.completed,
+                "model_calls": self.model_calls,
+                "failed": self.failed,
+                "progress": round((self.completed + self.failed) / self.total, 4) if self.total else None,
+                "elapsed_s": round(end - self.started_at, 1) if self.started_at is not None else None,
+                "skipped_records": self.skipped,
+                "error": self.error,
+            }
@@ -0,0 +1,175 @@
+"""
+Benchmark: audit log size, write and scan time, JSONL vs the compact format (app/auditlog.py).
+
+Synthetic records follow the shape /route writes today (execute + decision_only,
+preflight, usage, validation fields). The scan query is a typical dashboard
+aggregate: escalation rate and mean latency per chosen tier.
+
+Usage (from repo root):
+  python -m eval.bench_auditlog [--records 200000] [--dir /tmp]
+"""
+import argparse
+import json
+import os
+import random
+import time
+import uuid
+from collections import Counter
+
+from app.auditlog import AuditLogReader, CompactAuditWriter
+from app.json_codec import loads
+from app.logging_utils import write_jsonl
+
+TASK_TYPES = ["summarization", "extraction_structuring", "rewrite_formatting", "planning_checklist", "reasoning_decision"]
+REASONS = {
+    "summarization": ("cheap", ["RULE_KEYWORD_MATCH"], "Inferred task_type=summarization (keyword:summarize)"),
+    "extraction_structuring": ("cheap", ["RULE_KEYWORD_MATCH"], "Inferred task_type=extraction_structuring (keyword:extract)"),
+    "rewrite_formatting": ("cheap", ["RULE_INTENT_MATCH"], "Inferred task_type=rewrite_formatting (intent:rewrite)"),
+    "planning_checklist": ("strong", ["RULE_KEYWORD_MATCH", "RULE_KEYWORD_MATCH"],
+                           "Inferred task_type=planning_checklist (keyword:plan) | Escalated due to HARD_REASONING_KEYWORDS"),
+    "reasoning_decision": ("strong", ["RULE_INTENT_MATCH"], "Inferred task_type=reasoning_decision (intent:should we)"),
+}
+MODELS = {"cheap": "gemma3:1b", "strong": "llama3.1:latest"}
+
+
+def _record(rng: random.Random, ts: int):
+    tt = rng.choice(TASK_TYPES)
+    tier, codes, reason = REASONS[tt]
+    model = MODELS[tier]
+    decision = {"chosen_tier": tier, "chosen_model_name": model, "task_type": tt,
+                "reason_codes": codes, "routing_reason": reason}
+    n_chars = rng.randint(40, 4000)
+    base = {
+        "request_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "rules_version": 1,
+        "tenant": f"tenant-{rng.randint(1, 200)}",
+        "task_len_chars": n_chars,
+        "task_type_hint": rng.choice([None, tt]),
+        "risk_level": rng.choice(["low", "medium", "high"]),
+        "decision": decision,
+        "preflight": {"model": model, "est_input_tokens": n_chars // 4, "est_output_tokens": 250,
+                      "predicted_latency_ms": 6000 if tier == "cheap" else 70000, "predicted_cost": 0.26},
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts)),
+    }
+    if rng.random() < 0.2:
+        return {**base, "mode": "decision_only", "latency_ms_total": rng.randint(0, 3)}
+    escalated = tier == "cheap" and rng.random() < 0.1
+    final = MODELS["strong"] if escalated else model
+    llm = rng.randint(2000, 12000) if final == MODELS["cheap"] else rng.randint(30000, 140000)
+    return {
+        **base,
+        "mode": "execute",
+        "execution_mode": rng.choice(["direct", "cheap_first_verify"]),
+        "final_model_name": final,
+        "escalated": escalated,
+        "escalation_reason": "invalid_json" if escalated else None,
+        "cache_hit_first": rng.random() < 0.1,
+        "cache_hit_escalation": False,
+        "queue_wait_ms": rng.randint(0, 50),
+        "latency_ms_llm": llm,
+        "latency_ms_total": llm + rng.randint(1, 40),
+        "usage": {"input_tokens": n_chars // 4, "output_tokens": rng.randint(50, 400), "total_tokens": None},
+        "answer_len_chars": rng.randint(100, 2000),
+        "chunked": None,
+        "validation_cached": False,
+        "validation_skipped": None,
+        "format_constrained": False,
+        "json_repaired": False,
+    }
+
+
+def _aggregate(rows):
+    n, esc, lat = Counter(), Counter(), Counter()
+    for tier, mode, escalated, latency in rows:
+        if mode != "execute":
+            continue
+        n[tier] += 1
+        esc[tier] += bool(escalated)
+        lat[tier] += latency
+    return {t: (round(esc[t] / n[t], 4), round(lat[t] / n[t])) for t in n}
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--records", type=int, default=200_000)
+    ap.add_argument("--dir", default="/tmp")
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    t_start = 1_770_000_000
+    records = [_record(rng, t_start + i) for i in range(args.records)]
+    jsonl_path = os.path.join(args.dir, "bench_router.jsonl")
+    compact_path = os.path.join(args.dir, "bench_router.rlog")
+    for p in (jsonl_path, compact_path):
+        if os.path.exists(p):
+            os.remove(p)
+
+    # Both writers as /route calls them: one record at a time.
+    def write_jsonl_records():
+        for r in records:
+            write_jsonl(jsonl_path, r)
+    _, t_write_jsonl = _timed(write_jsonl_records)
+
+    def write_compact():
+        with CompactAuditWriter(compact_path) as w:
+            for r in records:
+                w.write(r)
+    _, t_write_compact = _timed(write_compact)
+
+    def scan_jsonl_stdlib():
+        with open(jsonl_path, "rb") as f:
+            rows = []
+            for line in f:
+                r = json.loads(line)
+                d = r.get("decision") or {}
+                rows.append((d.get("chosen_tier"), r.get("mode"), r.get("escalated"), r.get("latency_ms_total")))
+            return _aggregate(rows)
+
+    def scan_jsonl_codec():
+        with open(jsonl_path, "rb") as f:
+            rows = []
+            for line in f:
+                r = loads(line)
+                d = r.get("decision") or {}
+                rows.append((d.get("chosen_tier"), r.get("mode"), r.get("escalated"), r.get("latency_ms_total")))
+            return _aggregate(rows)
+
+    def scan_compact():
+        with AuditLogReader(compact_path) as reader:
+            cols = reader.columns(("decision.chosen_tier", "mode", "escalated", "latency_ms_total"))
+            return _aggregate(zip(*cols.values()))
+
+    def full_compact():
+        with AuditLogReader(compact_path) as reader:
+            return sum(1 for _ in reader.records())
+
+    results = {}
+    for name, fn in [("jsonl json.loads", scan_jsonl_stdlib), ("jsonl codec.loads", scan_jsonl_codec),
+                     ("compact scan()", scan_compact)]:
+        results[name] = _timed(fn)
+    n_full, t_full = _timed(full_compact)
+    assert n_full == args.records
+    agg = {name: r[0] for name, r in results.items()}
+    assert len({json.dumps(a, sort_keys=True) for a in agg.values()}) == 1, agg
+
+    size_jsonl, size_compact = os.path.getsize(jsonl_path), os.path.getsize(compact_path)
+    print(f"records: {args.records:,}")
+    print(f"size     jsonl {size_jsonl / 1e6:8.1f} MB   compact {size_compact / 1e6:8.1f} MB   "
+          f"({size_jsonl / size_compact:.1f}x smaller, {size_compact / args.records:.0f} B/record)")
+    print(f"write    jsonl {t_write_jsonl:8.2f} s    compact {t_write_compact:8.2f} s   "
+          f"({t_write_jsonl / args.records * 1e6:.0f} vs {t_write_compact / args.records * 1e6:.0f} us/record)")
+    print("scan (escalation rate + mean latency per tier):")
+    for name, (_, t) in results.items():
+        print(f"  {name:<20} {t:8.2f} s  {args.records / t:>12,.0f} rec/s")
+    print(f"  {'compact records()':<20} {t_full:8.2f} s  {args.records / t_full:>12,.0f} rec/s (full decode)")
+    print(f"result: {agg['compact scan()']}")
+
+
+if __name__ == "__main__":
+    main()
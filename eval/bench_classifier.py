@@ -0,0 +1,52 @@
+"""
+Latency benchmark for the task-type classifier: batched and single-task inference.
+
+Usage (from repo root):
+  python -m eval.bench_classifier [--model models/task_classifier.npz] [--batch 256]
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+from app.classifier import TaskTypeClassifier
+
+TASK_FILES = [Path("eval/tasks.jsonl"), Path("eval/inference_tasks.jsonl"), Path("eval/quality_tasks.jsonl")]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default="models/task_classifier.npz")
+    ap.add_argument("--batch", type=int, default=256)
+    ap.add_argument("--rounds", type=int, default=50)
+    args = ap.parse_args()
+
+    clf = TaskTypeClassifier.load(args.model)
+    texts = []
+    for path in TASK_FILES:
+        texts += [json.loads(l)["task"] for l in path.read_text(encoding="utf-8").splitlines() if l.strip()]
+    batch = (texts * (args.batch // len(texts) + 1))[: args.batch]
+
+    clf.predict(batch)  # warm up
+    t0 = time.perf_counter()
+    for _ in range(args.rounds):
+        clf.predict(batch)
+    batched_us = (time.perf_counter() - t0) / (args.rounds * len(batch)) * 1e6
+
+    t0 = time.perf_counter()
+    for _ in range(args.rounds):
+        for text in texts:
+            clf.predict_one(text)
+    single_us = (time.perf_counter() - t0) / (args.rounds * len(texts)) * 1e6
+
+    print(f"batched inference (batch={len(batch)}): {batched_us:8.1f} us/task")
+    print(f"single-task inference              : {single_us:8.1f} us/task")
+
+    print("\nInference-only tasks (no hints):")
+    inference = [json.loads(l)["task"] for l in Path("eval/inference_tasks.jsonl").read_text(encoding="utf-8").splitlines() if l.strip()]
+    for text, (label, conf) in list(zip(inference, clf.predict(inference)))[:10]:
+        print(f"  {conf:.2f} {label:<24} {text[:70]}")
+
+
+if __name__ == "__main__":
+    main()
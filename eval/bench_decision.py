@@ -0,0 +1,175 @@
+"""
+Microbenchmark: decision-only throughput, the original pydantic router vs the compact Decision path.
+
+  before: the baseline decide_route() (below, unchanged): per-request substring
+          scans -> RouteDecision (pydantic) -> model_dump() for the log
+  after:  decide_fast() -> Decision.to_dict() for the log (pydantic only at the boundary)
+
+Both sides build their inputs up front and run with decision_memo forced off, so
+the numbers measure routing, not memo hits; --memo adds a line with the memo on.
+
+Usage (from repo root):
+  python -m eval.bench_decision [--seconds 2] [--memo]
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import load_rules
+from app.router import HARD_REASONING_KEYWORDS, INTENT_VERBS, decide_fast
+from app.schemas import RouteDecision, RouteRequest, TaskType
+
+TASK_FILES = [Path("eval/tasks.jsonl"), Path("eval/inference_tasks.jsonl"), Path("eval/quality_tasks.jsonl")]
+
+
+# --- Baseline router (app/router.py before the compiled Decision path), kept verbatim ---
+
+def _contains_any(text: str, keywords: List[str]) -> bool:
+    t = text.lower()
+    return any(k.lower() in t for k in keywords)
+
+
+def _infer_from_intent_verbs(task: str) -> Tuple[Optional[TaskType], Optional[str]]:
+    task_l = task.lower()
+    for task_type, phrases in INTENT_VERBS.items():
+        for phrase in phrases:
+            if phrase in task_l:
+                return task_type, f"intent:{phrase}"
+    return None, None
+
+
+def _infer_task_type(task: str, rules: Dict[str, Any]) -> Tuple[TaskType, str]:
+    intent_task, intent_reason = _infer_from_intent_verbs(task)
+    if intent_task is not None:
+        return intent_task, intent_reason
+    task_l = task.lower()
+    for tt_name, tt_cfg in rules.get("task_types", {}).items():
+        for kw in tt_cfg.get("keywords", []):
+            if kw.lower() in task_l:
+                return TaskType(tt_name), f"keyword:{kw}"
+    return TaskType.summarization, "no_intent_or_keyword_match"
+
+
+def baseline_decide_route(req: RouteRequest, rules: Dict[str, Any]) -> RouteDecision:
+    reason_codes: List[str] = []
+    task_text = req.task
+
+    if req.task_type_hint is not None:
+        task_type = req.task_type_hint
+        reason_codes.append("RULE_TASK_TYPE_DEFAULT")
+        routing_reason = f"Used task_type_hint={task_type.value}"
+    else:
+        task_type, match_reason = _infer_task_type(task_text, rules)
+        if match_reason.startswith("intent:"):
+            reason_codes.append("RULE_INTENT_MATCH")
+        elif match_reason.startswith("keyword:"):
+            reason_codes.append("RULE_KEYWORD_MATCH")
+        else:
+            reason_codes.append("FALLBACK_DEFAULT")
+        routing_reason = f"Inferred task_type={task_type.value} ({match_reason})"
+
+    tt_cfg = rules.get("task_types", {}).get(task_type.value, {})
+    chosen_tier = tt_cfg.get("default_tier", rules.get("default_model_tier", "cheap"))
+
+    if _contains_any(task_text, HARD_REASONING_KEYWORDS) and chosen_tier != "strong":
+        chosen_tier = "strong"
+        reason_codes.append("RULE_KEYWORD_MATCH")
+        routing_reason += " | Escalated due to HARD_REASONING_KEYWORDS"
+
+    esc_keywords = tt_cfg.get("escalate_if_keywords", [])
+    if esc_keywords and _contains_any(task_text, esc_keywords) and chosen_tier != "strong":
+        chosen_tier = "strong"
+        reason_codes.append("RULE_KEYWORD_MATCH")
+        routing_reason += " | Escalated due to task_type escalation keywords"
+
+    heur = rules.get("heuristics", {})
+    threshold = int(heur.get("long_text_chars_threshold", 2500))
+    if len(task_text) >= threshold and chosen_tier != "strong":
+        chosen_tier = heur.get("long_text_escalate_to", "strong")
+        reason_codes.append("HEURISTIC_LONG_TEXT")
+        routing_reason += f" | Escalated due to long_text_chars>={threshold}"
+
+    if req.constraints.risk_level in ("high",) and chosen_tier != "strong":
+        chosen_tier = "strong"
+        reason_codes.append("RULE_TASK_TYPE_DEFAULT")
+        routing_reason += " | Escalated due to risk_level=high"
+
+    models = rules.get("models", {})
+    chosen_model_name = models.get(chosen_tier, {}).get("name", "UNKNOWN_MODEL")
+    return RouteDecision(
+        chosen_tier=chosen_tier,
+        chosen_model_name=chosen_model_name,
+        task_type=task_type,
+        reason_codes=reason_codes,
+        routing_reason=routing_reason,
+    )
+
+
+def _load_tasks():
+    tasks = []
+    for path in TASK_FILES:
+        for line in path.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                t = json.loads(line)
+                tasks.append((t["task"], t.get("task_type_hint"), (t.get("constraints") or {}).get("risk_level", "low")))
+    return tasks
+
+
+def _run(fn, inputs, seconds: float) -> float:
+    n = 0
+    t0 = time.perf_counter()
+    deadline = t0 + seconds
+    while time.perf_counter() < deadline:
+        for args in inputs:
+            fn(*args)
+        n += len(inputs)
+    return n / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=2.0)
+    ap.add_argument("--memo", action="store_true", help="also measure decide_fast with decision_memo on")
+    args = ap.parse_args()
+
+    rules_memo = load_rules("rules.yaml")
+    rules = {**rules_memo, "decision_memo": {"enabled": False}}
+    tasks = _load_tasks()
+    requests = [
+        (RouteRequest(task=task, task_type_hint=hint, constraints={"risk_level": risk}),)
+        for task, hint, risk in tasks
+    ]
+    fields = [
+        (task, TaskType(hint) if hint else None, risk)
+        for task, hint, risk in tasks
+    ]
+
+    def before(req):
+        return baseline_decide_route(req, rules).model_dump()
+
+    def after(task, hint, risk):
+        return decide_fast(task, hint, risk, rules).to_dict()
+
+    def after_no_log(task, hint, risk):
+        return decide_fast(task, hint, risk, rules)
+
+    def after_memo(task, hint, risk):
+        return decide_fast(task, hint, risk, rules_memo).to_dict()
+
+    before_rate = _run(before, requests, args.seconds)
+    after_rate = _run(after, fields, args.seconds)
+    raw_rate = _run(after_no_log, fields, args.seconds)
+
+    print(f"tasks: {len(tasks)} (decision_memo off)")
+    print(f"baseline router + model_dump        : {before_rate:>12,.0f} decisions/s")
+    print(f"Decision + to_dict                  : {after_rate:>12,.0f} decisions/s  ({after_rate / before_rate:.2f}x)")
+    print(f"Decision only (no rendering)        : {raw_rate:>12,.0f} decisions/s  ({raw_rate / before_rate:.2f}x)")
+    if args.memo:
+        memo_rate = _run(after_memo, fields, args.seconds)
+        print(f"Decision + to_dict, memo on         : {memo_rate:>12,.0f} decisions/s  ({memo_rate / before_rate:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
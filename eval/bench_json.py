@@ -0,0 +1,92 @@
+"""
+Benchmark: JSON encode cost of a /route response + audit record at different answer sizes,
+stdlib json.dumps(ensure_ascii=False) vs every fast backend that is installed.
+
+Usage (from repo root):
+  python -m eval.bench_json [--iterations 2000]
+"""
+import argparse
+import json
+import time
+
+from app import json_codec
+
+ANSWER_SIZES = [100, 1_000, 10_000, 100_000]
+
+
+def _payload(answer_chars: int):
+    answer = ("Résumé: revenue grew 18% YoY. " * (answer_chars // 30 + 1))[:answer_chars]
+    decision = {
+        "chosen_tier": "cheap",
+        "chosen_model_name": "gemma3:1b",
+        "task_type": "summarization",
+        "reason_codes": ["RULE_KEYWORD_MATCH"],
+        "routing_reason": "Inferred task_type=summarization (keyword:summarize)",
+    }
+    response = {
+        "request_id": "24deddcb-0636-4376-8a55-53237adc7cbb",
+        "decision": decision,
+        "answer": answer,
+        "latency_ms": 5123,
+        "usage": {"input_tokens": None, "output_tokens": None, "total_tokens": None},
+        "escalated": False,
+        "escalation_reason": None,
+        "final_model_name": "gemma3:1b",
+    }
+    record = {
+        "request_id": response["request_id"],
+        "mode": "execute",
+        "rules_version": 1,
+        "execution_mode": "direct",
+        "task_len_chars": 180,
+        "decision": decision,
+        "final_model_name": "gemma3:1b",
+        "latency_ms_llm": 5100,
+        "latency_ms_total": 5123,
+        "answer_len_chars": len(answer),
+        "ts": "2026-02-02T18:14:34Z",
+    }
+    return response, record
+
+
+def _encoders():
+    encs = {"stdlib (current)": lambda o: (json.dumps(o, ensure_ascii=False) + "\n").encode("utf-8")}
+    try:
+        import orjson
+        encs["orjson"] = orjson.dumps
+    except ImportError:
+        pass
+    try:
+        import msgspec
+        encs["msgspec"] = msgspec.json.Encoder().encode
+    except ImportError:
+        pass
+    encs[f"json_codec ({json_codec.BACKEND})"] = json_codec.dumps
+    return encs
+
+
+def _time(fn, objs, iterations: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        for o in objs:
+            fn(o)
+    return (time.perf_counter() - t0) / iterations * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--iterations", type=int, default=2000)
+    args = ap.parse_args()
+
+    encs = _encoders()
+    print(f"{'answer chars':>12} | " + " | ".join(f"{name:>22}" for name in encs))
+    for size in ANSWER_SIZES:
+        objs = _payload(size)
+        iters = max(50, args.iterations * 1000 // max(size, 1000))
+        cells = [f"{_time(fn, objs, iters):>19.2f} us" for fn in encs.values()]
+        print(f"{size:>12} | " + " | ".join(cells))
+    print("(per request: one response + one audit record)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: decision throughput with the decision memo and template prefix index (app/memo.py).
+
+Workloads:
+  repeated   eval task files replayed as-is (memo hits after the first pass)
+  templated  a long shared instruction prefix + unique payloads (memo misses, prefix index helps)
+  unique     unique untemplated texts (worst case: memo overhead only)
+
+Usage (from repo root):
+  python -m eval.bench_memo [--seconds 2]
+"""
+import argparse
+import copy
+import json
+import random
+import time
+from pathlib import Path
+
+from app.config import load_rules
+from app.router import decide_fast
+
+TASK_FILES = [Path("eval/tasks.jsonl"), Path("eval/inference_tasks.jsonl"), Path("eval/quality_tasks.jsonl")]
+
+# Long instruction prefix, the shape of templated traffic from internal tools.
+LONG_TEMPLATE = (
+    "You are helping the support team. Read the customer ticket below and produce a structured "
+    "triage note with the customer's main issue, the product area, the urgency and a suggested "
+    "next action. Keep the note factual, do not invent details, and keep the tone neutral. "
+) * 8 + "Ticket: "
+
+PAYLOAD_WORDS = ["login", "fails", "after", "update", "billing", "charged", "twice", "export", "slow",
+                 "dashboard", "missing", "data", "please", "help", "urgent", "since", "monday"]
+
+
+def _eval_tasks():
+    tasks = []
+    for path in TASK_FILES:
+        for line in path.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                t = json.loads(line)
+                tasks.append((t["task"], t.get("task_type_hint"), (t.get("constraints") or {}).get("risk_level", "low")))
+    return tasks
+
+
+def _payload(rng):
+    return " ".join(rng.choice(PAYLOAD_WORDS) for _ in range(rng.randint(20, 60)))
+
+
+def _run(tasks, rules, seconds: float) -> float:
+    n = 0
+    t0 = time.perf_counter()
+    deadline = t0 + seconds
+    while time.perf_counter() < deadline:
+        for task, hint, risk in tasks:
+            decide_fast(task, hint, risk, rules)
+        n += len(tasks)
+    return n / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rules", default="rules.yaml")
+    ap.add_argument("--seconds", type=float, default=2.0)
+    args = ap.parse_args()
+
+    base = load_rules(args.rules)
+    configs = {}
+    for name, memo_cfg in [
+        ("no memo", {"enabled": False}),
+        ("memo", {"enabled": True, "max_items": 10000}),
+        ("memo + templates", {"enabled": True, "max_items": 10000,
+                              "templates": list((base.get("decision_memo") or {}).get("templates") or []) + [LONG_TEMPLATE]}),
+    ]:
+        rules = copy.deepcopy(base)
+        rules["decision_memo"] = memo_cfg
+        configs[name] = rules
+
+    rng = random.Random(0)
+    workloads = {
+        "repeated": _eval_tasks(),
+        # Fresh payloads every run so the memo cannot serve them.
+        "templated": [(LONG_TEMPLATE + _payload(rng), None, "low") for _ in range(20000)],
+        "unique": [(_payload(rng) + f" #{i}", None, "low") for i in range(20000)],
+    }
+
+    print(f"{'workload':<12} " + " ".join(f"{name:>18}" for name in configs))
+    for wname, tasks in workloads.items():
+        row = []
+        for rules in configs.values():
+            rps = _run(tasks, rules, args.seconds)
+            row.append(f"{rps:>13,.0f} dec/s")
+        print(f"{wname:<12} " + " ".join(row))
+
+
+if __name__ == "__main__":
+    main()
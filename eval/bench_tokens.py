@@ -0,0 +1,152 @@
+"""
+Benchmark: token estimator accuracy and speed (app/tokens.py).
+
+Accuracy is measured against, in order of preference:
+  --ollama URL   exact prompt token counts from a running Ollama (raw prompt, num_predict=0)
+  tiktoken       cl100k_base, if installed
+  regex          a GPT-style pre-tokenizer approximation (always available)
+and --fit prints least-squares chars_per_token / non_ascii_weight to paste into
+rules.yaml `token_estimation.models`.
+
+Usage (from repo root):
+  python -m eval.bench_tokens [--ollama http://localhost:11434] [--fit] [--iterations 200]
+"""
+import argparse
+import json
+import math
+import re
+import time
+from pathlib import Path
+
+from app.config import load_rules
+from app.tokens import TokenEstimator
+
+TASK_FILES = [Path("eval/tasks.jsonl"), Path("eval/inference_tasks.jsonl"), Path("eval/quality_tasks.jsonl")]
+SPEED_SIZES = [1_000, 10_000, 100_000]
+
+_PRETOKEN = re.compile(r"'s|'t|'re|'ve|'m|'ll|'d| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+")
+
+
+def _regex_count(text: str) -> int:
+    n = 0
+    for piece in _PRETOKEN.findall(text):
+        extra = len(piece.encode("utf-8")) - len(piece)
+        n += max(1, math.ceil(len(piece) / 6)) + extra // 2
+    return n
+
+
+def _reference(args):
+    if args.ollama:
+        import requests
+
+        def count(text, model):
+            r = requests.post(
+                f"{args.ollama.rstrip('/')}/api/generate",
+                json={"model": model, "prompt": text, "raw": True, "stream": False, "options": {"num_predict": 0}},
+                timeout=120,
+            )
+            r.raise_for_status()
+            return int(r.json()["prompt_eval_count"])
+        return "ollama", count
+    try:
+        import tiktoken
+        enc = tiktoken.get_encoding("cl100k_base")
+        return "tiktoken cl100k_base", lambda text, model: len(enc.encode(text))
+    except ImportError:
+        return "regex approximation", lambda text, model: _regex_count(text)
+
+
+def _corpus():
+    texts = []
+    for path in TASK_FILES:
+        for line in path.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                texts.append(json.loads(line)["task"])
+    long_doc = " ".join(texts)
+    texts += [long_doc, long_doc * 4]
+    # Non-English / non-ASCII inputs, where a plain chars/4 rule is furthest off.
+    texts += [
+        "Résumé de la réunion : le chiffre d'affaires a progressé de 18 % sur un an, mais la marge a reculé.",
+        "Zusammenfassung: Die Kündigungsrate stieg von 2,1 % auf 2,8 %; Hauptursache ist das Onboarding.",
+        "会议纪要：收入同比增长18%，但由于云支出和招聘增加，营业利润率下降。",
+        "ユーザーはオンボーディングが分かりにくく、価格が不明確だと言っています。",
+        "Launch checklist ✅🚀: ship onboarding v2 📦, fix pricing page 💸, monitor churn 📉.",
+        '{"name": "Alex", "email": "alex@ex.com", "budget": 3000, "timeline_days": 10}',
+    ]
+    return texts
+
+
+def _fit(pairs):
+    """Least squares for tokens ~ a * chars + b * extra_utf8_bytes (no intercept)."""
+    sxx = sxy = syy = sx_t = sy_t = 0.0
+    for text, ref in pairs:
+        x = len(text)
+        y = len(text.encode("utf-8")) - x
+        sxx += x * x
+        sxy += x * y
+        syy += y * y
+        sx_t += x * ref
+        sy_t += y * ref
+    det = sxx * syy - sxy * sxy
+    if det == 0:
+        a, b = sx_t / sxx, 0.0
+    else:
+        a = (sx_t * syy - sy_t * sxy) / det
+        b = (sy_t * sxx - sx_t * sxy) / det
+    return round(1.0 / a, 2), round(b, 3)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rules", default="rules.yaml")
+    ap.add_argument("--ollama", default=None, help="Ollama base URL for exact reference counts")
+    ap.add_argument("--fit", action="store_true")
+    ap.add_argument("--iterations", type=int, default=200)
+    args = ap.parse_args()
+
+    rules = load_rules(args.rules)
+    estimator = TokenEstimator(rules.get("token_estimation"))
+    models = sorted({(cfg or {}).get("name") for cfg in (rules.get("models") or {}).values()} - {None})
+    ref_name, ref_count = _reference(args)
+    texts = _corpus()
+
+    print(f"accuracy vs {ref_name} ({len(texts)} texts)")
+    print(f"{'model':<20} {'estimator MAPE':>15} {'chars/4 MAPE':>13} {'max err':>8}")
+    for model in models:
+        pairs = [(t, ref_count(t, model)) for t in texts]
+        errs = [abs(estimator.estimate(t, model) - ref) / ref for t, ref in pairs if ref]
+        naive = [abs(len(t) / 4 - ref) / ref for t, ref in pairs if ref]
+        print(f"{model:<20} {100 * sum(errs) / len(errs):>14.1f}% {100 * sum(naive) / len(naive):>12.1f}% "
+              f"{100 * max(errs):>7.1f}%")
+        if args.fit:
+            cpt, w = _fit(pairs)
+            print(f"  fit: chars_per_token: {cpt}, non_ascii_weight: {w}")
+
+    print()
+    print(f"speed ({args.iterations} iterations, mixed ASCII/non-ASCII text)")
+    print(f"{'size':>8} {'cold µs':>9} {'cached µs':>10} {'len()//4 µs':>12}")
+    base = "Customers want AI features but complain about reliability — résumé 📉. " * 2000
+    for size in SPEED_SIZES:
+        # Fresh string objects per iteration, so neither the LRU nor str's own hash cache helps.
+        samples = [base[i:i + size] for i in range(args.iterations)]
+        t0 = time.perf_counter()
+        for s in samples:
+            estimator._estimate(s, estimator.calibration(models[0] if models else None))
+        cold = (time.perf_counter() - t0) / len(samples) * 1e6
+
+        s = samples[0]
+        estimator.estimate(s)
+        t0 = time.perf_counter()
+        for _ in range(args.iterations):
+            estimator.estimate(s)
+        cached = (time.perf_counter() - t0) / args.iterations * 1e6
+
+        t0 = time.perf_counter()
+        for s in samples:
+            len(s) // 4
+        naive = (time.perf_counter() - t0) / len(samples) * 1e6
+        print(f"{size:>8} {cold:>9.1f} {cached:>10.2f} {naive:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
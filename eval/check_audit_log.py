@@ -0,0 +1,92 @@
+"""
+Check: /route audit records round-trip through both audit formats with the
+installed JSON backend (including orjson.Fragment / msgspec.Raw pre-encoding).
+
+Sends decision-only and execute requests (against a stub model, no Ollama needed)
+with audit.format compact and jsonl, then checks the compact log's fixed columns
+(rules_version, final_model_name, ...) and that both logs hold the same records.
+
+Usage (from repo root):
+  python -m eval.check_audit_log
+  LLM_ROUTER_JSON=stdlib python -m eval.check_audit_log
+"""
+import os
+import sys
+import tempfile
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.auditlog import AuditLogReader, CompactAuditWriter, read_records
+from app.json_codec import BACKEND, fragment
+
+VOLATILE = ("request_id", "ts", "latency_ms_total", "latency_ms_llm")
+
+
+class _StubLLM:
+    def chat(self, model, user_text, system_text="", cancel=None, format=None):
+        return "- one\n- two\n- three", 5, {"input_tokens": 3, "output_tokens": 4, "total_tokens": 7}
+
+
+def _send(client: TestClient) -> None:
+    for payload in (
+        {"task": "Summarize in 3 bullets: the audit log check.", "execute": False},
+        {"task": "Summarize in 3 bullets: the audit log check."},
+        {"task": "Should we move the audit log to object storage?", "execution_mode": "cheap_first_verify"},
+    ):
+        r = client.post("/route", json=payload)
+        if r.status_code != 200:
+            raise SystemExit(f"FAIL: /route {payload} -> {r.status_code} {r.text}")
+
+
+def _run(log_path: str, compact: bool) -> None:
+    main.LOG_PATH = log_path
+    main.AUDIT_WRITER = CompactAuditWriter(log_path) if compact else None
+    try:
+        with TestClient(main.app) as client:
+            _send(client)
+    finally:
+        if main.AUDIT_WRITER is not None:
+            main.AUDIT_WRITER.close()
+
+
+def main_check() -> int:
+    fragments = type(fragment(1)) is not int
+    print(f"json backend: {BACKEND}, fragments: {'on' if fragments else 'off'}")
+
+    saved = main.LLM, main.LOG_PATH, main.AUDIT_WRITER
+    main.LLM = _StubLLM()
+    with tempfile.TemporaryDirectory() as tmp:
+        compact_path = os.path.join(tmp, "router.rlog")
+        jsonl_path = os.path.join(tmp, "router.jsonl")
+        try:
+            _run(compact_path, compact=True)
+            main.CACHE._store.clear()  # same cache hits on the second pass
+            _run(jsonl_path, compact=False)
+        finally:
+            main.LLM, main.LOG_PATH, main.AUDIT_WRITER = saved
+
+        with AuditLogReader(compact_path) as reader:
+            rows = list(reader.scan(("mode", "rules_version", "final_model_name", "decision.chosen_tier")))
+        print("compact scan():", rows)
+        failures = []
+        for row in rows:
+            if row["rules_version"] != main.RULES.get("version"):
+                failures.append(f"rules_version column: {row}")
+            if row["mode"] == "execute" and not row["final_model_name"]:
+                failures.append(f"final_model_name column: {row}")
+
+        def plain(path):
+            return [{k: v for k, v in r.items() if k not in VOLATILE} for r in read_records(path)]
+
+        if plain(compact_path) != plain(jsonl_path):
+            failures.append("compact and jsonl logs differ")
+    for f in failures:
+        print("FAIL:", f)
+    if not failures:
+        print("PASS: audit log check OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_check())
@@ -0,0 +1,46 @@
+"""
+Converts a JSONL audit log (logs/router.jsonl) to the compact format (app/auditlog.py).
+
+Usage (from repo root):
+  python -m eval.convert_audit_log logs/router.jsonl logs/router.rlog [--verify] [--append]
+"""
+import argparse
+import os
+import time
+
+from app.auditlog import convert_jsonl, read_records
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("src", help="JSONL audit log")
+    ap.add_argument("dst", help="compact audit log to create")
+    ap.add_argument("--append", action="store_true", help="append to an existing compact log")
+    ap.add_argument("--verify", action="store_true", help="read back and compare every record")
+    args = ap.parse_args()
+
+    if os.path.exists(args.dst) and not args.append:
+        raise SystemExit(f"{args.dst} exists (use --append to add to it)")
+
+    before = os.path.getsize(args.dst) if os.path.exists(args.dst) else 0
+    t0 = time.perf_counter()
+    n = convert_jsonl(args.src, args.dst)
+    elapsed = time.perf_counter() - t0
+    src_size, dst_size = os.path.getsize(args.src), os.path.getsize(args.dst) - before
+    print(f"Converted {n} records in {elapsed:.2f}s: {src_size:,} -> {dst_size:,} bytes "
+          f"({src_size / max(1, dst_size):.1f}x smaller)")
+
+    if args.verify:
+        converted = read_records(args.dst)
+        if args.append:
+            # Skip whatever the compact log held before this run.
+            total = sum(1 for _ in read_records(args.dst))
+            converted = (r for i, r in enumerate(read_records(args.dst)) if i >= total - n)
+        mismatches = sum(1 for a, b in zip(read_records(args.src), converted) if a != b)
+        if mismatches:
+            raise SystemExit(f"Verify FAILED: {mismatches} record(s) differ")
+        print(f"Verify OK: {n} records round-trip exactly")
+
+
+if __name__ == "__main__":
+    main()
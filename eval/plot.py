@@ -1,4 +1,6 @@
+import argparse
 import json
+import sys
 from pathlib import Path
 
 import pandas as pd
@@ -74,47 +76,112 @@ def flatten_inference_records(records):
         })
     return pd.DataFrame(rows)
 
-# -------- Load + flatten --------
-routing_raw = load_jsonl(ROUTING_PATH)
-df_r = flatten_routing_records(routing_raw)
-
-inference_raw = load_jsonl(INFERENCE_PATH) if INFERENCE_PATH.exists() else []
-df_i = flatten_inference_records(inference_raw) if inference_raw else pd.DataFrame()
-
-# -------- Chart A: Routing by task type (stacked) --------
-ct = pd.crosstab(df_r["task_type"], df_r["chosen_tier"])
-ct = ct.reindex(["summarization", "extraction_structuring", "rewrite_formatting", "planning_checklist", "reasoning_decision"], fill_value=0)
-ct.plot(kind="bar", stacked=True)
-plt.title("Routing by task type")
-plt.ylabel("Count")
-plt.tight_layout()
-plt.savefig(OUT_DIR / "routing_by_task_type.png")
-plt.close()
-
-# -------- Chart B: Avg latency by tier --------
-lat = df_r.groupby("chosen_tier")["latency_ms_total"].mean().sort_index()
-lat.plot(kind="bar")
-plt.title("Average latency by tier (ms)")
-plt.ylabel("Latency (ms)")
-plt.tight_layout()
-plt.savefig(OUT_DIR / "latency_by_tier.png")
-plt.close()
-
-# -------- Chart C: Inference task type distribution (no hints) --------
-if not df_i.empty:
-    df_i["task_type"].value_counts().plot(kind="bar")
-    plt.title("Inferred task types (no hints)")
+def render_results():
+    # -------- Load + flatten --------
+    routing_raw = load_jsonl(ROUTING_PATH)
+    df_r = flatten_routing_records(routing_raw)
+
+    inference_raw = load_jsonl(INFERENCE_PATH) if INFERENCE_PATH.exists() else []
+    df_i = flatten_inference_records(inference_raw) if inference_raw else pd.DataFrame()
+
+    # -------- Chart A: Routing by task type (stacked) --------
+    ct = pd.crosstab(df_r["task_type"], df_r["chosen_tier"])
+    ct = ct.reindex(["summarization", "extraction_structuring", "rewrite_formatting", "planning_checklist", "reasoning_decision"], fill_value=0)
+    ct.plot(kind="bar", stacked=True)
+    plt.title("Routing by task type")
     plt.ylabel("Count")
     plt.tight_layout()
-    plt.savefig(OUT_DIR / "inference_task_type_distribution.png")
+    plt.savefig(OUT_DIR / "routing_by_task_type.png")
     plt.close()
 
-    # -------- Chart D: Tier by risk (inference only) --------
-    pd.crosstab(df_i["risk_level"], df_i["chosen_tier"]).plot(kind="bar", stacked=True)
-    plt.title("Tier by risk level (inference only)")
+    # -------- Chart B: Avg latency by tier --------
+    lat = df_r.groupby("chosen_tier")["latency_ms_total"].mean().sort_index()
+    lat.plot(kind="bar")
+    plt.title("Average latency by tier (ms)")
+    plt.ylabel("Latency (ms)")
+    plt.tight_layout()
+    plt.savefig(OUT_DIR / "latency_by_tier.png")
+    plt.close()
+
+    # -------- Chart C: Inference task type distribution (no hints) --------
+    if not df_i.empty:
+        df_i["task_type"].value_counts().plot(kind="bar")
+        plt.title("Inferred task types (no hints)")
+        plt.ylabel("Count")
+        plt.tight_layout()
+        plt.savefig(OUT_DIR / "inference_task_type_distribution.png")
+        plt.close()
+
+        # -------- Chart D: Tier by risk (inference only) --------
+        pd.crosstab(df_i["risk_level"], df_i["chosen_tier"]).plot(kind="bar", stacked=True)
+        plt.title("Tier by risk level (inference only)")
+        plt.ylabel("Count")
+        plt.tight_layout()
+        plt.savefig(OUT_DIR / "tier_by_risk.png")
+        plt.close()
+
+
+
+def load_snapshot(source: str):
+    """/stats snapshot from a saved JSON file or a live URL (e.g. http://localhost:8000/stats)."""
+    if source.startswith(("http://", "https://")):
+        import requests
+        r = requests.get(source, timeout=30)
+        r.raise_for_status()
+        return r.json()
+    return json.loads(Path(source).read_text(encoding="utf-8"))
+
+
+def render_snapshot(snapshot, window: str = "5m"):
+    """
+    Charts from an in-process aggregator snapshot (app/stats.py) instead of full JSONL files.
+    """
+    win = (snapshot.get("windows") or {}).get(window)
+    if not win:
+        raise SystemExit(f"Window {window!r} not in snapshot (have: {sorted(snapshot.get('windows') or {})})")
+
+    # -------- Tier mix --------
+    pd.Series(win.get("tier_mix") or {}, dtype=float).sort_index().plot(kind="bar")
+    plt.title(f"Tier mix (last {window})")
     plt.ylabel("Count")
     plt.tight_layout()
-    plt.savefig(OUT_DIR / "tier_by_risk.png")
+    plt.savefig(OUT_DIR / f"live_tier_mix_{window}.png")
     plt.close()
 
-print(f"Saved plots to: {OUT_DIR.resolve()}")
+    # -------- Escalation reasons --------
+    reasons = win.get("escalation_reasons") or {}
+    if reasons:
+        pd.Series(reasons, dtype=float).sort_values(ascending=False).plot(kind="bar")
+        plt.title(f"Escalation reasons (last {window}, rate={win.get('escalation_rate')})")
+        plt.ylabel("Count")
+        plt.tight_layout()
+        plt.savefig(OUT_DIR / f"live_escalation_reasons_{window}.png")
+        plt.close()
+
+    # -------- Latency quantiles by task type --------
+    lat = {k: v for k, v in (win.get("latency_ms") or {}).items() if v.get("count")}
+    if lat:
+        df = pd.DataFrame(lat).T[["p50", "p90", "p99"]].astype(float)
+        df.plot(kind="bar")
+        plt.title(f"Latency quantiles by task type (last {window}, cache hit rate={win.get('cache_hit_rate')})")
+        plt.ylabel("Latency (ms)")
+        plt.tight_layout()
+        plt.savefig(OUT_DIR / f"live_latency_quantiles_{window}.png")
+        plt.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--snapshot", help="render from a /stats snapshot (file path or URL) instead of eval JSONL files")
+    ap.add_argument("--window", default="5m", help="snapshot window: 1m, 5m or 1h")
+    args = ap.parse_args(argv)
+
+    if args.snapshot:
+        render_snapshot(load_snapshot(args.snapshot), args.window)
+    else:
+        render_results()
+    print(f"Saved plots to: {OUT_DIR.resolve()}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
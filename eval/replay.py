@@ -0,0 +1,308 @@
+"""
+Offline replay: re-route historical traffic against a (new) rules.yaml without a server.
+
+Inputs can be any mix of:
+  - logs/router.jsonl           (needs audit.log_task_text: true, otherwise records have no task)
+  - logs/router.rlog            (same, compact audit log; see app/auditlog.py)
+  - eval/results*.jsonl         ({"task_payload": ..., "response": {"decision": ...}})
+  - eval/inference_results.jsonl ({"task": ..., "risk_level": ..., "decision": ...})
+  - eval/*tasks.jsonl           (raw payloads; pass --old-rules to get the "before" side)
+
+The "before" decision is the one recorded in the file, or the one produced by
+--old-rules when given. Cost/latency projections use per-model stats mined from
+--stats (default logs/router.jsonl) and models.<tier>.relative_cost in the rules.
+
+Usage (from repo root):
+  python -m eval.replay --rules rules.yaml --input eval/results.jsonl --input logs/router.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from app.auditlog import AuditLogReader, is_compact, read_records
+from app.config import load_rules
+from app.router import decide_fast
+
+MAX_EXAMPLES = 20
+
+_NEW_RULES: Optional[Dict[str, Any]] = None
+_OLD_RULES: Optional[Dict[str, Any]] = None
+
+
+def _init_worker(rules_path: str, old_rules_path: Optional[str]) -> None:
+    global _NEW_RULES, _OLD_RULES
+    _NEW_RULES = load_rules(rules_path)
+    _OLD_RULES = load_rules(old_rules_path) if old_rules_path else None
+
+
+def _extract(rec: Dict[str, Any]):
+    """
+    Normalizes the supported record shapes to (task, hint, risk_level, logged_decision).
+    """
+    if "task_payload" in rec:
+        payload = rec.get("task_payload") or {}
+        decision = (rec.get("response") or {}).get("decision")
+    else:
+        payload = rec
+        decision = rec.get("decision")
+
+    task = payload.get("task")
+    hint = payload.get("task_type_hint")
+    risk = payload.get("risk_level") or (payload.get("constraints") or {}).get("risk_level") or "low"
+    return task, hint, risk, decision
+
+
+def _new_partial() -> Dict[str, Any]:
+    return {
+        "records": 0,
+        "replayed": 0,
+        "skipped": Counter(),
+        "tier_transitions": Counter(),
+        "task_type_transitions": Counter(),
+        "reason_codes_added": Counter(),
+        "reason_codes_removed": Counter(),
+        "model_transitions": Counter(),
+        "changed": 0,
+        "examples": [],
+    }
+
+
+def _replay_batch(lines: List[Any]) -> Dict[str, Any]:
+    """`lines` are raw JSONL lines, or already-decoded records from a compact log."""
+    out = _new_partial()
+    for line in lines:
+        if isinstance(line, dict):
+            out["records"] += 1
+            rec = line
+        elif not line.strip():
+            continue
+        else:
+            out["records"] += 1
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                out["skipped"]["bad_json"] += 1
+                continue
+
+        task, hint, risk, old = _extract(rec)
+        if not task:
+            out["skipped"]["no_task_text"] += 1
+            continue
+        if rec.get("mode") not in (None, "execute", "decision_only"):
+            out["skipped"]["mode:" + str(rec.get("mode"))] += 1
+            continue
+
+        try:
+            if _OLD_RULES is not None:
+                old = decide_fast(task, hint, risk, _OLD_RULES).to_dict()
+            if not old:
+                out["skipped"]["no_old_decision"] += 1
+                continue
+            new = decide_fast(task, hint, risk, _NEW_RULES).to_dict()
+        except ValueError:
+            out["skipped"]["invalid_fields"] += 1
+            continue
+
+        out["replayed"] += 1
+        out["tier_transitions"][f"{old.get('chosen_tier')}->{new['chosen_tier']}"] += 1
+        out["task_type_transitions"][f"{old.get('task_type')}->{new['task_type']}"] += 1
+        out["model_transitions"][(old.get("chosen_model_name"), new["chosen_model_name"])] += 1
+
+        old_codes = Counter(old.get("reason_codes") or [])
+        new_codes = Counter(new["reason_codes"])
+        out["reason_codes_added"].update(new_codes - old_codes)
+        out["reason_codes_removed"].update(old_codes - new_codes)
+
+        if (
+            old.get("chosen_tier") != new["chosen_tier"]
+            or old.get("task_type") != new["task_type"]
+            or old_codes != new_codes
+        ):
+            out["changed"] += 1
+            if len(out["examples"]) < MAX_EXAMPLES:
+                out["examples"].append({
+                    "task": task[:200],
+                    "old": {k: old.get(k) for k in ("chosen_tier", "task_type", "reason_codes")},
+                    "new": {k: new[k] for k in ("chosen_tier", "task_type", "reason_codes")},
+                })
+    return out
+
+
+def _merge(total: Dict[str, Any], part: Dict[str, Any]) -> None:
+    for k, v in part.items():
+        if k == "examples":
+            total[k].extend(v[: MAX_EXAMPLES - len(total[k])])
+        elif isinstance(v, Counter):
+            total[k].update(v)
+        else:
+            total[k] += v
+
+
+def _iter_batches(paths: List[Path], batch_size: int) -> Iterator[List[Any]]:
+    batch: List[Any] = []
+    for path in paths:
+        compact = is_compact(str(path))
+        with nullcontext(read_records(str(path))) if compact else path.open("r", encoding="utf-8") as lines:
+            for line in lines:
+                batch.append(line)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+    if batch:
+        yield batch
+
+
+def load_model_stats(path: Path) -> Dict[str, Dict[str, float]]:
+    """
+    Mean upstream latency per model from the audit log, counting only real
+    (non-cached, non-escalated) calls.
+    """
+    sums: Counter = Counter()
+    counts: Counter = Counter()
+    if not path.exists():
+        return {}
+    if is_compact(str(path)):
+        # Hot columns only: no JSON decoding.
+        with AuditLogReader(str(path)) as reader:
+            for rec in reader.scan(("mode", "escalated", "cache_hit_first", "cache_hit", "final_model_name", "latency_ms_llm")):
+                if rec["mode"] != "execute" or rec["escalated"] or rec["cache_hit_first"] or rec["cache_hit"]:
+                    continue
+                model, lat = rec["final_model_name"], rec["latency_ms_llm"]
+                if model and lat:
+                    sums[model] += lat
+                    counts[model] += 1
+        return {m: {"avg_latency_ms": sums[m] / counts[m], "samples": counts[m]} for m in counts}
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if rec.get("mode") != "execute" or rec.get("escalated"):
+                continue
+            if rec.get("cache_hit_first") or rec.get("cache_hit"):
+                continue
+            model = rec.get("final_model_name")
+            lat = rec.get("latency_ms_llm")
+            if model and isinstance(lat, (int, float)) and lat > 0:
+                sums[model] += lat
+                counts[model] += 1
+    return {m: {"avg_latency_ms": sums[m] / counts[m], "samples": counts[m]} for m in counts}
+
+
+def project(model_transitions: Counter, model_stats: Dict[str, Dict[str, float]], rules: Dict[str, Any]) -> Dict[str, Any]:
+    cost_by_model = {
+        (cfg or {}).get("name"): (cfg or {}).get("relative_cost")
+        for cfg in (rules.get("models") or {}).values()
+    }
+    old_lat = new_lat = old_cost = new_cost = 0.0
+    unknown_latency: Counter = Counter()
+    for (old_model, new_model), n in model_transitions.items():
+        for model, side in ((old_model, "old"), (new_model, "new")):
+            lat = (model_stats.get(model) or {}).get("avg_latency_ms")
+            cost = cost_by_model.get(model)
+            if lat is None:
+                unknown_latency[model] += n
+            if side == "old":
+                old_lat += (lat or 0.0) * n
+                old_cost += (cost or 0.0) * n
+            else:
+                new_lat += (lat or 0.0) * n
+                new_cost += (cost or 0.0) * n
+    total = max(1, sum(model_transitions.values()))
+    return {
+        "avg_latency_ms_old": round(old_lat / total, 1),
+        "avg_latency_ms_new": round(new_lat / total, 1),
+        "cost_units_old": round(old_cost, 2),
+        "cost_units_new": round(new_cost, 2),
+        "cost_delta_pct": round(100.0 * (new_cost - old_cost) / old_cost, 2) if old_cost else None,
+        "models_without_latency_stats": dict(unknown_latency),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rules", default="rules.yaml", help="candidate rules to replay against")
+    ap.add_argument("--old-rules", default=None, help="recompute the 'before' side with these rules")
+    ap.add_argument("--input", action="append", required=True, help="JSONL file or compact audit log (repeatable)")
+    ap.add_argument("--stats", default="logs/router.jsonl", help="audit log (JSONL or compact) used for per-model latency stats")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--batch-size", type=int, default=20000)
+    ap.add_argument("--out", default="eval/replay_report.json")
+    args = ap.parse_args(argv)
+
+    paths = [Path(p) for p in args.input]
+    for p in paths:
+        if not p.exists():
+            raise FileNotFoundError(f"Missing {p}")
+
+    t0 = time.perf_counter()
+    total = _new_partial()
+    if args.workers <= 1:
+        _init_worker(args.rules, args.old_rules)
+        for batch in _iter_batches(paths, args.batch_size):
+            _merge(total, _replay_batch(batch))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_init_worker,
+            initargs=(args.rules, args.old_rules),
+        ) as pool:
+            # Executor.map would submit (and so read) every batch up front; keep a
+            # bounded window in flight instead, merged in input order.
+            window = 2 * args.workers
+            in_flight: Deque[Future] = deque()
+            for batch in _iter_batches(paths, args.batch_size):
+                if len(in_flight) >= window:
+                    _merge(total, in_flight.popleft().result())
+                in_flight.append(pool.submit(_replay_batch, batch))
+            while in_flight:
+                _merge(total, in_flight.popleft().result())
+    elapsed_s = time.perf_counter() - t0
+
+    rules = load_rules(args.rules)
+    model_stats = load_model_stats(Path(args.stats))
+    report = {
+        "inputs": [str(p) for p in paths],
+        "rules": args.rules,
+        "old_rules": args.old_rules,
+        "records": total["records"],
+        "replayed": total["replayed"],
+        "changed": total["changed"],
+        "changed_pct": round(100.0 * total["changed"] / max(1, total["replayed"]), 2),
+        "skipped": dict(total["skipped"]),
+        "tier_transitions": dict(total["tier_transitions"].most_common()),
+        "task_type_transitions": dict(total["task_type_transitions"].most_common()),
+        "reason_codes_added": dict(total["reason_codes_added"].most_common()),
+        "reason_codes_removed": dict(total["reason_codes_removed"].most_common()),
+        "model_stats": model_stats,
+        "projection": project(total["model_transitions"], model_stats, rules),
+        "examples": total["examples"],
+        "elapsed_s": round(elapsed_s, 3),
+        "records_per_s": round(total["records"] / elapsed_s, 1) if elapsed_s else None,
+    }
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    print(f"Replayed {report['replayed']}/{report['records']} records in {report['elapsed_s']}s "
+          f"({report['records_per_s']} rec/s), changed: {report['changed']} ({report['changed_pct']}%)")
+    print("Tier transitions:", report["tier_transitions"])
+    print("Skipped:", report["skipped"])
+    print("Projection:", report["projection"])
+    print(f"Report saved to {out}")
+    return report
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
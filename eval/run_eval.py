@@ -1,51 +1,56 @@
-import json
-import time
+"""
+Usage (from repo root): python -m eval.run_eval [--concurrency N] [--timeout S] [--fresh]
+                    or: python eval/run_eval.py [...]
+Resumes from eval results already written unless --fresh (see eval/runner.py).
+"""
+import argparse
+import sys
 import requests
 from pathlib import Path
-from tqdm import tqdm
+
+if __package__ in (None, ""):
+    # Run as a file (python eval/run_eval.py): make the repo root importable.
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from eval.runner import add_runner_args, check_resumable, load_tasks, run_tasks
 
 BASE_URL = "http://localhost:8000"
 TASKS_PATH = Path("eval/tasks.jsonl")
 RESULTS_PATH = Path("eval/results.jsonl")
 
-def post(payload):
-    r = requests.post(f"{BASE_URL}/route", json=payload, timeout=600)
+def post(payload, base_url=BASE_URL):
+    r = requests.post(f"{base_url}/route", json=payload, timeout=600)
     r.raise_for_status()
     return r.json()
 
-def warmup():
+def warmup(base_url=BASE_URL):
     # warmup cheap
-    post({"task": "Say 'warmup ok' in 2 words.", "execute": True, "constraints": {"risk_level": "low"}})
+    post({"task": "Say 'warmup ok' in 2 words.", "execute": True, "constraints": {"risk_level": "low"}}, base_url)
     # warmup strong (force by decision language)
-    post({"task": "Compare A vs B briefly and decide.", "execute": True, "constraints": {"risk_level": "high"}})
+    post({"task": "Compare A vs B briefly and decide.", "execute": True, "constraints": {"risk_level": "high"}}, base_url)
+
+def build_record(index, payload, data, elapsed_ms):
+    return {
+        "task_payload": payload,
+        "response": data,
+        "elapsed_ms_client": elapsed_ms,
+    }
 
 def main():
-    assert TASKS_PATH.exists(), f"Missing {TASKS_PATH}"
-    tasks = [json.loads(line) for line in TASKS_PATH.read_text(encoding="utf-8").splitlines() if line.strip()]
+    ap = argparse.ArgumentParser()
+    # Latency benchmark: sequential by default, so numbers stay comparable with earlier runs.
+    add_runner_args(ap, concurrency=1)
+    args = ap.parse_args()
 
-    print(f"Warmup...")
-    warmup()
+    tasks = load_tasks(TASKS_PATH)
+    for payload in tasks:
+        payload.setdefault("execute", True)
 
-    print(f"Running {len(tasks)} tasks against {BASE_URL}/route ...")
-    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
-    if RESULTS_PATH.exists():
-        RESULTS_PATH.unlink()
+    check_resumable(RESULTS_PATH, args.fresh)  # before spending time on warmup
+    print(f"Warmup...")
+    warmup(args.base_url)
 
-    for payload in tqdm(tasks, total=len(tasks)):
-        payload.setdefault("execute", True)
-        t0 = time.perf_counter()
-        data = post(payload)
-        elapsed_ms = int((time.perf_counter() - t0) * 1000)
-
-        record = {
-            "task_payload": payload,
-            "response": data,
-            "elapsed_ms_client": elapsed_ms,
-        }
-        with RESULTS_PATH.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
-
-    print(f"Done. Results saved to {RESULTS_PATH}")
+    run_tasks(tasks, RESULTS_PATH, build_record, args.base_url, args.concurrency, args.timeout, args.fresh)
 
 if __name__ == "__main__":
     main()
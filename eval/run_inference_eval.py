@@ -1,33 +1,39 @@
-import json
-import requests
+"""
+Usage (from repo root): python -m eval.run_inference_eval [--concurrency N] [--timeout S] [--fresh]
+                    or: python eval/run_inference_eval.py [...]
+Resumes from eval results already written unless --fresh (see eval/runner.py).
+"""
+import argparse
+import sys
 from pathlib import Path
-from tqdm import tqdm
 
-BASE_URL = "http://localhost:8000"
+if __package__ in (None, ""):
+    # Run as a file (python eval/run_inference_eval.py): make the repo root importable.
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from eval.runner import add_runner_args, load_tasks, run_tasks
+
 TASKS_PATH = Path("eval/inference_tasks.jsonl")
 OUT_PATH = Path("eval/inference_results.jsonl")
 
-def main():
-    tasks = [json.loads(l) for l in TASKS_PATH.read_text().splitlines() if l.strip()]
-    OUT_PATH.parent.mkdir(exist_ok=True)
+def build_record(index, payload, resp, elapsed_ms):
+    return {
+        "task": payload["task"],
+        "risk_level": payload["constraints"]["risk_level"],
+        "decision": resp["decision"]
+    }
 
-    if OUT_PATH.exists():
-        OUT_PATH.unlink()
+def main():
+    ap = argparse.ArgumentParser()
+    # Routing only (no LLM calls), so it can run wide.
+    add_runner_args(ap, concurrency=16, timeout_s=60)
+    args = ap.parse_args()
 
-    for payload in tqdm(tasks, total=len(tasks)):
+    tasks = load_tasks(TASKS_PATH)
+    for payload in tasks:
         payload["execute"] = False  # routing only
-        r = requests.post(f"{BASE_URL}/route", json=payload, timeout=60)
-        r.raise_for_status()
-        resp = r.json()
-
-        with OUT_PATH.open("a", encoding="utf-8") as f:
-            f.write(json.dumps({
-                "task": payload["task"],
-                "risk_level": payload["constraints"]["risk_level"],
-                "decision": resp["decision"]
-            }) + "\n")
-
-    print("Inference eval done:", OUT_PATH)
+
+    run_tasks(tasks, OUT_PATH, build_record, args.base_url, args.concurrency, args.timeout, args.fresh)
 
 if __name__ == "__main__":
     main()
@@ -1,36 +1,38 @@
-import json
-import time
-import requests
+"""
+Usage (from repo root): python -m eval.run_quality_eval [--concurrency N] [--timeout S] [--fresh]
+                    or: python eval/run_quality_eval.py [...]
+Resumes from eval results already written unless --fresh (see eval/runner.py).
+"""
+import argparse
+import sys
 from pathlib import Path
-from tqdm import tqdm
 
-BASE_URL = "http://localhost:8000"
+if __package__ in (None, ""):
+    # Run as a file (python eval/run_quality_eval.py): make the repo root importable.
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from eval.runner import add_runner_args, load_tasks, run_tasks
+
 TASKS_PATH = Path("eval/quality_tasks.jsonl")
 OUT_PATH = Path("eval/quality_results.jsonl")
 
+def build_record(index, payload, resp, elapsed_ms):
+    return {
+        "task_payload": payload,
+        "response": resp,
+        "elapsed_ms_client": elapsed_ms,
+    }
+
 def main():
-    tasks = [json.loads(l) for l in TASKS_PATH.read_text(encoding="utf-8").splitlines() if l.strip()]
-    OUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    if OUT_PATH.exists():
-        OUT_PATH.unlink()
+    ap = argparse.ArgumentParser()
+    add_runner_args(ap, concurrency=4)
+    args = ap.parse_args()
 
-    for payload in tqdm(tasks, total=len(tasks)):
+    tasks = load_tasks(TASKS_PATH)
+    for payload in tasks:
         payload.setdefault("execute", True)
-        t0 = time.perf_counter()
-        r = requests.post(f"{BASE_URL}/route", json=payload, timeout=600)
-        r.raise_for_status()
-        resp = r.json()
-        dt = int((time.perf_counter() - t0) * 1000)
-
-        rec = {
-            "task_payload": payload,
-            "response": resp,
-            "elapsed_ms_client": dt,
-        }
-        with OUT_PATH.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-
-    print(f"Saved {len(tasks)} results to {OUT_PATH}")
+
+    run_tasks(tasks, OUT_PATH, build_record, args.base_url, args.concurrency, args.timeout, args.fresh)
 
 if __name__ == "__main__":
     main()
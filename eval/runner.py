@@ -0,0 +1,198 @@
+"""
+Shared async runner for the /route eval scripts (run_eval, run_quality_eval, run_inference_eval).
+
+- concurrency: up to N requests in flight over one pooled httpx.AsyncClient
+- checkpointing: every finished task is appended (and flushed) to the results file
+  with its `task_index`; a rerun skips indices already there, so a crash only loses
+  in-flight tasks. Pass fresh=True (--fresh) to start over.
+- per-task timeouts: a task that times out or errors is reported and left out of
+  the results file, so the next run retries it.
+- summary: throughput and client latency distribution, printed and written next
+  to the results as <name>.summary.json.
+
+Latency numbers include server-side queueing, so use --concurrency 1 when the
+run is meant to be compared with sequential baselines.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import httpx
+from tqdm import tqdm
+
+BASE_URL = "http://localhost:8000"
+
+# (task_index, payload, response_json, elapsed_ms) -> record written to the results file
+BuildRecord = Callable[[int, Dict[str, Any], Dict[str, Any], int], Dict[str, Any]]
+
+
+def add_runner_args(ap: argparse.ArgumentParser, concurrency: int = 4, timeout_s: float = 600) -> None:
+    ap.add_argument("--base-url", default=BASE_URL)
+    ap.add_argument("--concurrency", type=int, default=concurrency)
+    ap.add_argument("--timeout", type=float, default=timeout_s, help="per-task timeout in seconds")
+    ap.add_argument("--fresh", action="store_true", help="discard existing results instead of resuming")
+
+
+def load_tasks(path: Path) -> List[Dict[str, Any]]:
+    assert path.exists(), f"Missing {path}"
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def _completed(out_path: Path) -> Set[int]:
+    """
+    Task indices already in the results file; drops a torn last line left by a crash.
+    Raises ValueError for a legacy file (records without task_index): resuming
+    would append a second full run after it.
+    """
+    if not out_path.exists():
+        return set()
+    data = out_path.read_bytes()
+    if data and not data.endswith(b"\n"):
+        cut = data.rfind(b"\n") + 1
+        with out_path.open("r+b") as f:
+            f.truncate(cut)
+        data = data[:cut]
+    done = set()
+    for line in data.decode("utf-8").splitlines():
+        if line.strip():
+            idx = json.loads(line).get("task_index")
+            if idx is None:
+                raise ValueError(
+                    f"{out_path} has records without task_index (written before resumable runs); "
+                    "rerun with --fresh to replace it"
+                )
+            done.add(int(idx))
+    return done
+
+
+def check_resumable(out_path: Path, fresh: bool) -> None:
+    """Exits with a message if out_path cannot be resumed (legacy results file without --fresh)."""
+    if fresh:
+        return
+    try:
+        _completed(out_path)
+    except ValueError as e:
+        raise SystemExit(f"error: {e}")
+
+
+def _sort_results(out_path: Path) -> None:
+    """Rewrites the finished file in task order (atomic replace), for stable diffs."""
+    lines = [l for l in out_path.read_text(encoding="utf-8").splitlines() if l.strip()]
+    lines.sort(key=lambda l: json.loads(l)["task_index"])
+    tmp = out_path.with_suffix(out_path.suffix + ".tmp")
+    tmp.write_text("".join(l + "\n" for l in lines), encoding="utf-8")
+    os.replace(tmp, out_path)
+
+
+def _percentile(sorted_values: List[int], q: float) -> Optional[int]:
+    if not sorted_values:
+        return None
+    k = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def summarize(latencies_ms: List[int], wall_s: float, **counts: int) -> Dict[str, Any]:
+    lat = sorted(latencies_ms)
+    return {
+        **counts,
+        "wall_s": round(wall_s, 2),
+        "throughput_tasks_per_s": round(len(lat) / wall_s, 3) if wall_s > 0 else None,
+        "latency_ms": {
+            "mean": round(sum(lat) / len(lat), 1) if lat else None,
+            "p50": _percentile(lat, 0.5),
+            "p90": _percentile(lat, 0.9),
+            "p99": _percentile(lat, 0.99),
+            "max": lat[-1] if lat else None,
+        },
+    }
+
+
+async def _run(
+    tasks: List[Dict[str, Any]],
+    out_path: Path,
+    build_record: BuildRecord,
+    base_url: str,
+    concurrency: int,
+    timeout_s: float,
+    fresh: bool,
+) -> Dict[str, Any]:
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    if fresh and out_path.exists():
+        out_path.unlink()
+    done = _completed(out_path)
+    pending = [(i, t) for i, t in enumerate(tasks) if i not in done]
+    print(f"{len(tasks)} tasks, {len(done)} already in {out_path}, running {len(pending)} "
+          f"(concurrency={concurrency}) against {base_url}/route ...")
+
+    sem = asyncio.Semaphore(max(1, concurrency))
+    latencies: List[int] = []
+    failures: Dict[str, int] = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    t_start = time.perf_counter()
+
+    with out_path.open("a", encoding="utf-8") as out, tqdm(total=len(pending)) as bar:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout_s) as client:
+
+            async def one(index: int, payload: Dict[str, Any]) -> None:
+                async with sem:
+                    t0 = time.perf_counter()
+                    try:
+                        r = await asyncio.wait_for(client.post("/route", json=payload), timeout_s)
+                        r.raise_for_status()
+                        data = r.json()
+                    except Exception as e:
+                        key = "timeout" if isinstance(e, (asyncio.TimeoutError, httpx.TimeoutException)) else type(e).__name__
+                        failures[key] = failures.get(key, 0) + 1
+                        tqdm.write(f"task {index} failed: {key}: {e}")
+                        return
+                    finally:
+                        bar.update(1)
+                    elapsed_ms = int((time.perf_counter() - t0) * 1000)
+                latencies.append(elapsed_ms)
+                # Single event-loop thread: whole-line writes cannot interleave.
+                out.write(json.dumps({"task_index": index, **build_record(index, payload, data, elapsed_ms)},
+                                     ensure_ascii=False) + "\n")
+                out.flush()
+
+            await asyncio.gather(*(one(i, t) for i, t in pending))
+
+    wall_s = time.perf_counter() - t_start
+    failed = sum(failures.values())
+    if failed == 0:
+        _sort_results(out_path)
+    summary = summarize(
+        latencies,
+        wall_s,
+        tasks=len(tasks),
+        resumed_from=len(done),
+        completed=len(latencies),
+        failed=failed,
+    )
+    summary["failures"] = failures
+    summary["concurrency"] = concurrency
+    return summary
+
+
+def run_tasks(
+    tasks: List[Dict[str, Any]],
+    out_path: Path,
+    build_record: BuildRecord,
+    base_url: str = BASE_URL,
+    concurrency: int = 4,
+    timeout_s: float = 600,
+    fresh: bool = False,
+) -> Dict[str, Any]:
+    """Runs `tasks` through /route, checkpointing into out_path; returns (and saves) the summary."""
+    check_resumable(out_path, fresh)
+    summary = asyncio.run(_run(tasks, out_path, build_record, base_url, concurrency, timeout_s, fresh))
+    summary_path = out_path.with_suffix(".summary.json")
+    summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    print(json.dumps(summary, indent=2))
+    if summary["failed"]:
+        print(f"{summary['failed']} task(s) failed; rerun to retry them (completed ones are kept).")
+    print(f"Results: {out_path}  Summary: {summary_path}")
+    return summary
@@ -0,0 +1,82 @@
+"""
+Trains the optional task-type classifier (app/classifier.py) offline and saves it.
+
+Labelled data: payloads with a task_type_hint from eval/tasks.jsonl and
+eval/quality_tasks.jsonl, plus audit-log records that carry both the task text
+(audit.log_task_text: true) and a task_type_hint.
+
+Usage (from repo root):
+  python -m eval.train_classifier [--out models/task_classifier.npz] [--folds 5]
+"""
+import argparse
+import random
+from pathlib import Path
+
+from app.auditlog import read_records
+from app.classifier import DEFAULT_N_FEATURES, train
+from app.schemas import TaskType
+
+TASK_FILES = [Path("eval/tasks.jsonl"), Path("eval/quality_tasks.jsonl")]
+LOG_PATHS = [Path("logs/router.jsonl"), Path("logs/router.rlog")]  # JSONL or compact audit log
+
+
+def load_examples(paths, log_paths):
+    seen = set()
+    examples = []
+    for path in list(paths) + list(log_paths):
+        if not path.exists():
+            continue
+        for rec in read_records(str(path)):
+            rec = rec.get("task_payload", rec)
+            task, label = rec.get("task"), rec.get("task_type_hint")
+            if not task or not label or (task, label) in seen:
+                continue
+            seen.add((task, label))
+            examples.append((task, label))
+    return examples
+
+
+def cross_validate(examples, classes, folds: int, n_features: int, epochs: int) -> float:
+    shuffled = examples[:]
+    random.Random(0).shuffle(shuffled)
+    correct = 0
+    for k in range(folds):
+        test = shuffled[k::folds]
+        trainset = [e for i, e in enumerate(shuffled) if i % folds != k]
+        if not test or not trainset:
+            continue
+        clf = train([t for t, _ in trainset], [y for _, y in trainset], classes, n_features, epochs)
+        preds = clf.predict([t for t, _ in test])
+        correct += sum(1 for (label, _), (_, y) in zip(preds, test) if label == y)
+    return correct / len(examples)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default="models/task_classifier.npz")
+    ap.add_argument("--folds", type=int, default=5)
+    ap.add_argument("--epochs", type=int, default=200)
+    ap.add_argument("--n-features", type=int, default=DEFAULT_N_FEATURES)
+    args = ap.parse_args()
+
+    examples = load_examples(TASK_FILES, LOG_PATHS)
+    if not examples:
+        raise SystemExit("No labelled examples found.")
+    classes = [t.value for t in TaskType]
+
+    print(f"Examples: {len(examples)}")
+    if args.folds > 1:
+        acc = cross_validate(examples, classes, args.folds, args.n_features, args.epochs)
+        print(f"{args.folds}-fold CV accuracy: {acc:.3f}")
+
+    clf = train([t for t, _ in examples], [y for _, y in examples], classes, args.n_features, args.epochs)
+    preds = clf.predict([t for t, _ in examples])
+    train_acc = sum(1 for (label, _), (_, y) in zip(preds, examples) if label == y) / len(examples)
+    print(f"Train accuracy: {train_acc:.3f}")
+
+    clf.save(args.out)
+    print(f"Saved classifier to {args.out}")
+
+
+if __name__ == "__main__":
+    main()